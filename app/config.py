@@ -1,5 +1,6 @@
 """App config using Pydantic"""
 
+from functools import lru_cache
 from pathlib import Path
 
 from pydantic import BaseModel, Field
@@ -9,6 +10,9 @@ class DatabaseConfig(BaseModel):
     """Database configuration"""
 
     path: Path = Field(default=Path("./data/metrics.db"))
+    journal_mode: str = Field(default="WAL")
+    cache_size_kb: int = Field(default=64000)
+    mmap_size: int = Field(default=268435456)
 
 
 class LlmConfig(BaseModel):
@@ -46,6 +50,11 @@ class AppConfig(BaseModel):
         env_prefix = "COMPASS_"
 
 
+@lru_cache(maxsize=1)
 def load_config() -> AppConfig:
-    """Load the application configuration from environment variables"""
+    """Load the application configuration from environment variables.
+
+    The config is built once per process; call ``load_config.cache_clear()``
+    (e.g. in tests) to pick up changed settings.
+    """
     return AppConfig()
@@ -1,9 +1,29 @@
 """Database schema and init for SQLite"""
 
 from contextlib import contextmanager
+from datetime import date, datetime
 import sqlite3
+import threading
 from pathlib import Path
-from typing import Optional, Generator
+from typing import Optional, Generator, Iterable, Iterator
+
+
+# Replace sqlite3's deprecated Python-level date/time adapters and
+# converters with the C-implemented ISO 8601 parsers
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(sep=" "))
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_converter(
+    "TIMESTAMP", lambda value: datetime.fromisoformat(value.decode())
+)
+sqlite3.register_converter("DATE", lambda value: date.fromisoformat(value.decode()))
+
+# Rows fetched per lock acquisition by Database.iter_execute
+ITER_BATCH_SIZE = 256
+
+
+def count_words(text: Optional[str]) -> Optional[int]:
+    """Count whitespace-separated words, as stored in word_count"""
+    return len(text.split()) if text is not None else None
 
 
 SCHEMA = """
@@ -39,15 +59,20 @@ CREATE TABLE IF NOT EXISTS metric_entries (
     value_decimal REAL,
     value_text TEXT,
     metadata TEXT,  -- JSON string for additional data
+    word_count INTEGER,  -- Words in value_text, for text summaries
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
 );
 
 -- Indexes for common queries
-CREATE INDEX IF NOT EXISTS idx_metric_entries_user_metric
-    ON metric_entries(user_id, metric_name);
+CREATE INDEX IF NOT EXISTS idx_metric_entries_user_metric_ts
+    ON metric_entries(user_id, metric_name, timestamp DESC);
 
-CREATE INDEX IF NOT EXISTS idx_metric_entries_timestamp
-    ON metric_entries(timestamp);
+-- Superseded by idx_metric_entries_user_metric_ts (same leftmost prefix)
+DROP INDEX IF EXISTS idx_metric_entries_user_metric;
+
+-- Every entries query filters on user_id first, so a bare timestamp index
+-- is never chosen and only slows down writes
+DROP INDEX IF EXISTS idx_metric_entries_timestamp;
 
 CREATE INDEX IF NOT EXISTS idx_metric_entries_user_timestamp
     ON metric_entries(user_id, timestamp);
@@ -68,10 +93,22 @@ CREATE TABLE IF NOT EXISTS daily_summary_cache (
 class Database:
     """Database connection manager and init"""
 
-    def __init__(self, db_path: Path) -> None:
+    def __init__(
+        self,
+        db_path: Path,
+        journal_mode: str = "WAL",
+        cache_size_kb: int = 64000,
+        mmap_size: int = 268435456,
+    ) -> None:
         self.db_path: Path = db_path
+        self.journal_mode: str = journal_mode
+        self.cache_size_kb: int = cache_size_kb
+        self.mmap_size: int = mmap_size
         self._ensure_directory()
         self._initialized: bool = False
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        self._in_transaction: bool = False
 
     def _ensure_directory(self) -> None:
         """Ensure the database directory exists"""
@@ -82,45 +119,174 @@ class Database:
         if self._initialized:
             return
         with self.get_connection() as conn:
+            migrating = (
+                conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?",
+                    ("idx_metric_entries_user_metric_ts",),
+                ).fetchone()
+                is None
+            )
             conn.executescript(SCHEMA)
+            self._add_word_count(conn)
+            if migrating:
+                # Refresh planner statistics so the new index gets picked up
+                conn.execute("ANALYZE")
             conn.commit()
         self._initialized = True
 
-    @contextmanager
-    def get_connection(self) -> Generator[sqlite3.Connection]:
-        """Context manager for database connection"""
+    def _add_word_count(self, conn: sqlite3.Connection) -> None:
+        """Add and backfill word_count on databases created before it"""
+        columns = {
+            row["name"] for row in conn.execute("PRAGMA table_info(metric_entries)")
+        }
+        if "word_count" in columns:
+            return
+        conn.execute("ALTER TABLE metric_entries ADD COLUMN word_count INTEGER")
+        conn.create_function("count_words", 1, count_words, deterministic=True)
+        conn.execute(
+            "UPDATE metric_entries SET word_count = count_words(value_text) "
+            "WHERE value_text IS NOT NULL"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the long-lived connection shared by all queries"""
         conn = sqlite3.connect(
             str(self.db_path),
-            detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False,
+            cached_statements=256,
         )
         conn.row_factory = sqlite3.Row
-        try:
-            yield conn
-        finally:
-            conn.close()
+        self._apply_pragmas(conn)
+        return conn
+
+    def _apply_pragmas(self, conn: sqlite3.Connection) -> None:
+        """Tune the connection for a local, write-light workload"""
+        pragmas = (
+            f"PRAGMA journal_mode={self.journal_mode}",
+            "PRAGMA synchronous=NORMAL",
+            "PRAGMA temp_store=MEMORY",
+            f"PRAGMA cache_size=-{self.cache_size_kb}",
+            f"PRAGMA mmap_size={self.mmap_size}",
+            "PRAGMA busy_timeout=5000",
+        )
+        for pragma in pragmas:
+            try:
+                conn.execute(pragma)
+            except sqlite3.DatabaseError:
+                # Read-only mounts can't switch journal mode; keep defaults
+                pass
+
+    @contextmanager
+    def get_connection(self) -> Generator[sqlite3.Connection]:
+        """Context manager for the shared database connection.
+
+        The connection is opened lazily on first use and held for the
+        lifetime of the Database; the lock serializes access across threads.
+        """
+        with self._lock:
+            if self._conn is None:
+                self._conn = self._connect()
+            try:
+                yield self._conn
+            except Exception:
+                # Inside transaction() the owner decides whether to roll back
+                if not self._in_transaction:
+                    self._conn.rollback()
+                raise
 
-    def execute(self, query: str, params: Optional[tuple] = None) -> list[dict]:
-        """Execute a query and return the results as a list of dictionaries"""
+    @contextmanager
+    def transaction(self) -> Generator[sqlite3.Connection]:
+        """Group several statements into one write transaction.
+
+        Takes the write lock up front with BEGIN IMMEDIATE, commits on exit
+        and rolls back if the block raises. The ``execute*`` helpers skip
+        their own commit while a transaction is open, and nested calls join
+        the outer transaction.
+        """
+        with self.get_connection() as conn:
+            if self._in_transaction:
+                yield conn
+                return
+            conn.execute("BEGIN IMMEDIATE")
+            self._in_transaction = True
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            else:
+                conn.commit()
+            finally:
+                self._in_transaction = False
+
+    def _commit(self, conn: sqlite3.Connection) -> None:
+        """Commit unless an explicit transaction is in progress"""
+        if not self._in_transaction:
+            conn.commit()
+
+    def close(self) -> None:
+        """Close the shared connection, if open"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def execute(self, query: str, params: Optional[tuple] = None) -> list[sqlite3.Row]:
+        """Execute a query and return the resulting rows.
+
+        Rows support both key and index access; wrap in ``dict`` when a
+        real dictionary is needed.
+        """
         with self.get_connection() as conn:
             cursor = conn.cursor()
             if params:
                 cursor.execute(query, params)
             else:
                 cursor.execute(query)
-            conn.commit()
-            return [dict(row) for row in cursor.fetchall()]
+            rows = cursor.fetchall()
+            self._commit(conn)
+            return rows
 
-    def execute_one(self, query: str, params: Optional[tuple] = None) -> Optional[dict]:
-        """Execute a query and return a single result as a dictionary"""
+    def iter_execute(
+        self,
+        query: str,
+        params: Optional[tuple] = None,
+        batch_size: int = ITER_BATCH_SIZE,
+    ) -> Iterator[sqlite3.Row]:
+        """Execute a read query and yield rows one at a time.
+
+        Rows are fetched ``batch_size`` at a time under the connection lock,
+        which is released before each batch is yielded, so a slow or
+        abandoned consumer never blocks other threads. Rows written while
+        iterating may or may not be included.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.execute(query, params or ())
+        try:
+            while True:
+                with self._lock:
+                    rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            with self._lock:
+                cursor.close()
+
+    def execute_one(
+        self, query: str, params: Optional[tuple] = None
+    ) -> Optional[sqlite3.Row]:
+        """Execute a query and return a single result row"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             if params:
                 cursor.execute(query, params)
             else:
                 cursor.execute(query)
-            conn.commit()
             row = cursor.fetchone()
-            return dict(row) if row else None
+            self._commit(conn)
+            return row
 
     def execute_insert(self, query: str, params: Optional[tuple] = None) -> int:
         """Execute an insert query and return the last inserted ID"""
@@ -130,5 +296,12 @@ class Database:
                 cursor.execute(query, params)
             else:
                 cursor.execute(query)
-            conn.commit()
+            self._commit(conn)
             return cursor.lastrowid
+
+    def execute_many(self, query: str, params_seq: Iterable[tuple]) -> int:
+        """Execute a statement once per parameter tuple; returns rows changed"""
+        with self.get_connection() as conn:
+            cursor = conn.executemany(query, params_seq)
+            self._commit(conn)
+            return cursor.rowcount
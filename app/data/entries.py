@@ -1,37 +1,229 @@
 """Data access layer for metric entries"""
 
-from typing import Any, Optional
+from typing import Any, Iterator, Literal, Optional
 from datetime import datetime, timedelta
-import json
+import itertools
+import sqlite3
+import sys
+import threading
+import weakref
 
-from app.data.database import Database
+import orjson
+
+from app.data.database import Database, count_words
 from app.data.models import MetricEntryDb
 from app.metrics.base import InputType
 
 
+_SQL_INSERT = """
+    INSERT INTO metric_entries
+    (user_id, metric_name, timestamp, value_type,
+     value_boolean, value_integer, value_decimal, value_text, word_count,
+     metadata)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_GET_BY_ID = "SELECT * FROM metric_entries WHERE id = ?"
+
+_SQL_GET_FOR_DATE = """
+    SELECT * FROM metric_entries
+    WHERE user_id = ? AND metric_name = ?
+    AND timestamp >= ? AND timestamp <= ?
+    ORDER BY timestamp DESC
+    LIMIT 1
+"""
+
+_SQL_LATEST = """
+    SELECT * FROM metric_entries
+    WHERE user_id = ? AND metric_name = ?
+    ORDER BY timestamp DESC
+    LIMIT ?
+"""
+
+_SQL_AGGREGATE_NUMERIC = """
+    SELECT
+        COUNT(*) AS count,
+        SUM(value_decimal) AS total,
+        AVG(value_decimal) AS average,
+        MIN(value_decimal) AS min,
+        MAX(value_decimal) AS max,
+        (
+            SELECT value_decimal FROM metric_entries
+            WHERE user_id = ? AND metric_name = ? AND timestamp >= ?
+            ORDER BY timestamp DESC
+            LIMIT 1
+        ) AS latest,
+        (
+            SELECT value_decimal FROM metric_entries
+            WHERE user_id = ? AND metric_name = ? AND timestamp >= ?
+            ORDER BY timestamp ASC
+            LIMIT 1
+        ) AS oldest
+    FROM metric_entries
+    WHERE user_id = ? AND metric_name = ? AND timestamp >= ?
+"""
+
+_SQL_AGGREGATE_CATEGORICAL = """
+    SELECT value_text, COUNT(*) AS count
+    FROM metric_entries
+    WHERE user_id = ? AND metric_name = ? AND timestamp >= ?
+    GROUP BY value_text
+    ORDER BY MAX(timestamp) DESC
+"""
+
+_SQL_COUNT_YES_NO = """
+    SELECT
+        COUNT(CASE WHEN value_text = ? THEN 1 END) AS yes_count,
+        COUNT(*) AS total
+    FROM metric_entries
+    WHERE user_id = ? AND metric_name = ? AND timestamp >= ?
+"""
+
+_SQL_UPDATE_SAME_DAY = """
+    UPDATE metric_entries
+    SET value_type = ?, value_boolean = ?, value_integer = ?,
+        value_decimal = ?, value_text = ?, word_count = ?, metadata = ?,
+        timestamp = ?
+    WHERE id = (
+        SELECT id FROM metric_entries
+        WHERE user_id = ? AND metric_name = ?
+        AND timestamp >= ? AND timestamp <= ?
+        ORDER BY timestamp DESC
+        LIMIT 1
+    )
+"""
+
+_SQL_INSERT_IF_NEW_DAY = """
+    INSERT INTO metric_entries
+    (user_id, metric_name, timestamp, value_type,
+     value_boolean, value_integer, value_decimal, value_text, word_count,
+     metadata)
+    SELECT ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
+    WHERE NOT EXISTS (
+        SELECT 1 FROM metric_entries
+        WHERE user_id = ? AND metric_name = ?
+        AND timestamp >= ? AND timestamp <= ?
+    )
+"""
+_SQL_TEXT_SUMMARY = """
+    SELECT
+        COUNT(*) AS count,
+        SUM(word_count) AS total_words,
+        (
+            SELECT value_text FROM metric_entries
+            WHERE user_id = ? AND metric_name = ? AND timestamp >= ?
+            AND word_count > 0
+            ORDER BY timestamp DESC
+            LIMIT 1
+        ) AS latest_text
+    FROM metric_entries
+    WHERE user_id = ? AND metric_name = ? AND timestamp >= ?
+    AND word_count > 0
+"""
+
+# (user_id, metric_name, value, value_type, timestamp, metadata), matching
+# the arguments of MetricEntryRepository.create
+EntryRow = tuple[int, str, Any, InputType, Optional[datetime], Optional[dict[str, Any]]]
+
+
+# Value coercer and its slot in (boolean, integer, decimal, text) columns
+_VALUE_COLUMNS: dict[InputType, tuple[type, int]] = {
+    InputType.BOOLEAN: (bool, 0),
+    InputType.INTEGER: (int, 1),
+    InputType.DECIMAL: (float, 2),
+    InputType.TEXT: (str, 3),
+}
+
+# Longer text values are free-form notes; interning those only grows the
+# interned-string table
+_INTERN_MAX_LEN = 16
+
+
+def _value_columns(value: Any, value_type: InputType) -> list[Any]:
+    """Spread a value into the four typed value columns plus word_count."""
+    columns: list[Any] = [None, None, None, None, None]
+    column = _VALUE_COLUMNS.get(value_type)
+    if column is not None:
+        coerce, slot = column
+        columns[slot] = coerce(value)
+        columns[4] = count_words(columns[3])
+    return columns
+
+
+def _sql_timestamp(value: datetime) -> str:
+    """Format a datetime the way TIMESTAMP columns store it.
+
+    Binding the string directly skips sqlite3's datetime adapter.
+    """
+    return value.isoformat(sep=" ")
+
+
+def _day_bounds(value: datetime) -> tuple[str, str]:
+    """First and last timestamp strings of the day containing ``value``."""
+    start_of_day = value.replace(hour=0, minute=0, second=0, microsecond=0)
+    end_of_day = value.replace(hour=23, minute=59, second=59, microsecond=999999)
+    return _sql_timestamp(start_of_day), _sql_timestamp(end_of_day)
+
+
+def _cutoff(days: int) -> str:
+    """Timestamp string for ``days`` days before now."""
+    return _sql_timestamp(datetime.now() - timedelta(days=days))
+
+
+def _entry_from_row(row: sqlite3.Row) -> MetricEntryDb:
+    """Build a MetricEntryDb from a database row, skipping validation.
+
+    Rows come from our own schema, so only the columns SQLite can't type
+    for us are coerced here.
+    """
+    data = dict(row)
+    data["metric_name"] = sys.intern(data["metric_name"])
+    data["value_type"] = InputType(data["value_type"])
+    value_text = data["value_text"]
+    if value_text is not None and len(value_text) <= _INTERN_MAX_LEN:
+        # Share one object per option ("Yes", "Good", ...) so comparisons
+        # against the module constants hit the identity fast path
+        data["value_text"] = sys.intern(value_text)
+    if data["value_boolean"] is not None:
+        data["value_boolean"] = bool(data["value_boolean"])
+    return MetricEntryDb.model_construct(**data)
+
+
+# Entry-write stamps per database, shared by every repository on it. Stamps
+# come from one process-wide counter, so no two databases ever hold the
+# same one, even after a database is garbage collected
+_VERSION_STAMPS = itertools.count(1)
+_VERSIONS: "weakref.WeakKeyDictionary[Database, int]" = weakref.WeakKeyDictionary()
+_VERSIONS_LOCK = threading.Lock()
+
+
 class MetricEntryRepository:
     """Repository for metric entry operations"""
 
     def __init__(self, db: Database) -> None:
         self.db = db
 
+    @property
+    def version(self) -> int:
+        """Stamp that changes on every entry write to this database."""
+        with _VERSIONS_LOCK:
+            version = _VERSIONS.get(self.db)
+            if version is None:
+                version = _VERSIONS[self.db] = next(_VERSION_STAMPS)
+            return version
+
+    def _bump_version(self) -> None:
+        with _VERSIONS_LOCK:
+            _VERSIONS[self.db] = next(_VERSION_STAMPS)
+
     def get_for_date(
         self, user_id: int, metric_name: str, date: datetime
     ) -> Optional[MetricEntryDb]:
         """Get entry for a specific date (ignoring time)."""
-        start_of_day = date.replace(hour=0, minute=0, second=0, microsecond=0)
-        end_of_day = date.replace(hour=23, minute=59, second=59, microsecond=999999)
         row = self.db.execute_one(
-            """
-            SELECT * FROM metric_entries
-            WHERE user_id = ? AND metric_name = ?
-            AND timestamp >= ? AND timestamp <= ?
-            ORDER BY timestamp DESC
-            LIMIT 1
-            """,
-            (user_id, metric_name, start_of_day, end_of_day),
+            _SQL_GET_FOR_DATE, (user_id, metric_name, *_day_bounds(date))
         )
-        return MetricEntryDb(**row) if row else None
+        return _entry_from_row(row) if row else None
 
     def update(
         self,
@@ -42,25 +234,17 @@ class MetricEntryRepository:
         metadata: Optional[dict[str, Any]] = None,
     ) -> MetricEntryDb:
         """Update an existing metric entry"""
-        value_boolean = None
-        value_integer = None
-        value_decimal = None
-        value_text = None
-        if value_type == InputType.BOOLEAN:
-            value_boolean = bool(value)
-        elif value_type == InputType.INTEGER:
-            value_integer = int(value)
-        elif value_type == InputType.DECIMAL:
-            value_decimal = float(value)
-        elif value_type == InputType.TEXT:
-            value_text = str(value)
-        metadata_json = json.dumps(metadata) if metadata else None
+        value_boolean, value_integer, value_decimal, value_text, word_count = (
+            _value_columns(value, value_type)
+        )
+        metadata_json = orjson.dumps(metadata).decode() if metadata else None
         update_parts = [
             "value_type = ?",
             "value_boolean = ?",
             "value_integer = ?",
             "value_decimal = ?",
             "value_text = ?",
+            "word_count = ?",
             "metadata = ?",
         ]
         params = [
@@ -69,6 +253,7 @@ class MetricEntryRepository:
             value_integer,
             value_decimal,
             value_text,
+            word_count,
             metadata_json,
         ]
         if timestamp is not None:
@@ -83,6 +268,7 @@ class MetricEntryRepository:
             """,
             tuple(params),
         )
+        self._bump_version()
         return self.get_by_id(entry_id)
 
     def create(
@@ -97,26 +283,12 @@ class MetricEntryRepository:
         """Create a new metric entry"""
         if timestamp is None:
             timestamp = datetime.now()
-        value_boolean = None
-        value_integer = None
-        value_decimal = None
-        value_text = None
-        if value_type == InputType.BOOLEAN:
-            value_boolean = bool(value)
-        elif value_type == InputType.INTEGER:
-            value_integer = int(value)
-        elif value_type == InputType.DECIMAL:
-            value_decimal = float(value)
-        elif value_type == InputType.TEXT:
-            value_text = str(value)
-        metadata_json = json.dumps(metadata) if metadata else None
+        value_boolean, value_integer, value_decimal, value_text, word_count = (
+            _value_columns(value, value_type)
+        )
+        metadata_json = orjson.dumps(metadata).decode() if metadata else None
         entry_id = self.db.execute_insert(
-            """
-            INSERT INTO metric_entries
-            (user_id, metric_name, timestamp, value_type,
-             value_boolean, value_integer, value_decimal, value_text, metadata)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
+            _SQL_INSERT,
             (
                 user_id,
                 metric_name,
@@ -126,10 +298,101 @@ class MetricEntryRepository:
                 value_integer,
                 value_decimal,
                 value_text,
+                word_count,
                 metadata_json,
             ),
         )
-        return self.get_by_id(entry_id)
+        self._bump_version()
+        # Every column is known here, so skip reading the row back
+        return MetricEntryDb.model_construct(
+            id=entry_id,
+            user_id=user_id,
+            metric_name=metric_name,
+            timestamp=timestamp,
+            value_type=value_type,
+            value_boolean=value_boolean,
+            value_integer=value_integer,
+            value_decimal=value_decimal,
+            value_text=value_text,
+            word_count=word_count,
+            metadata=metadata_json,
+        )
+
+    def create_many(self, rows: list[EntryRow]) -> int:
+        """Insert many entries in a single transaction.
+
+        Each row is ``(user_id, metric_name, value, value_type, timestamp,
+        metadata)``, matching the arguments of ``create``. Returns the number
+        of rows inserted rather than an id: sqlite3 does not report a
+        ``lastrowid`` for ``executemany``. An empty batch writes nothing and
+        leaves the entry version untouched.
+        """
+        if not rows:
+            return 0
+        now = datetime.now()
+        params = [
+            (
+                user_id,
+                metric_name,
+                timestamp if timestamp is not None else now,
+                value_type,
+                *_value_columns(value, value_type),
+                orjson.dumps(metadata).decode() if metadata else None,
+            )
+            for user_id, metric_name, value, value_type, timestamp, metadata in rows
+        ]
+        with self.db.transaction() as conn:
+            cursor = conn.executemany(_SQL_INSERT, params)
+        self._bump_version()
+        return cursor.rowcount
+
+    def bulk_upsert(self, rows: list[EntryRow]) -> int:
+        """Create or update many entries in a single transaction.
+
+        Rows are shaped as for ``create_many``. Like ``create_or_update``,
+        each row replaces the latest entry for its metric on the same day,
+        or is inserted when that day has none. When the batch holds several
+        rows for the same user, metric and day, the last one wins, as it
+        would after calling ``create_or_update`` for each in turn. Returns
+        the number of rows written after that collapse.
+        """
+        if not rows:
+            return 0
+        now = datetime.now()
+        # Last row per (user, metric, day); later rows overwrite earlier ones
+        latest: dict[tuple, EntryRow] = {}
+        for row in rows:
+            user_id, metric_name, value, value_type, timestamp, metadata = row
+            if timestamp is None:
+                timestamp = now
+            key = (user_id, metric_name, timestamp.date())
+            latest[key] = (user_id, metric_name, value, value_type, timestamp, metadata)
+        updates = []
+        inserts = []
+        for row in latest.values():
+            user_id, metric_name, value, value_type, timestamp, metadata = row
+            columns = _value_columns(value, value_type)
+            metadata_json = orjson.dumps(metadata).decode() if metadata else None
+            same_day = (user_id, metric_name, *_day_bounds(timestamp))
+            updates.append((value_type, *columns, metadata_json, timestamp, *same_day))
+            inserts.append(
+                (
+                    user_id,
+                    metric_name,
+                    timestamp,
+                    value_type,
+                    *columns,
+                    metadata_json,
+                    *same_day,
+                )
+            )
+        # Updating first leaves a same-day row behind for every existing
+        # entry, so the guarded insert only adds the genuinely new ones
+        with self.db.transaction() as conn:
+            updated = conn.executemany(_SQL_UPDATE_SAME_DAY, updates).rowcount
+            inserted = conn.executemany(_SQL_INSERT_IF_NEW_DAY, inserts).rowcount
+        self._bump_version()
+        return updated + inserted
 
     def create_or_update(
         self,
@@ -153,10 +416,8 @@ class MetricEntryRepository:
 
     def get_by_id(self, entry_id: int) -> Optional[MetricEntryDb]:
         """Get a metric entry by ID."""
-        row = self.db.execute_one(
-            "SELECT * FROM metric_entries WHERE id = ?", (entry_id,)
-        )
-        return MetricEntryDb(**row) if row else None
+        row = self.db.execute_one(_SQL_GET_BY_ID, (entry_id,))
+        return _entry_from_row(row) if row else None
 
     def get_for_user(
         self,
@@ -165,62 +426,138 @@ class MetricEntryRepository:
         days: Optional[int] = None,
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
+        order: Literal["asc", "desc"] = "desc",
     ) -> list[MetricEntryDb]:
-        """Get metric entries for a user with optional filtering."""
+        """Get metric entries for a user with optional filtering.
+
+        Entries are newest first unless ``order="asc"``.
+        """
+        query, params = self._user_query(
+            user_id, metric_name, days, start_date, end_date, order
+        )
+        rows = self.db.execute(query, params)
+        return [_entry_from_row(row) for row in rows]
+
+    def iter_for_user(
+        self,
+        user_id: int,
+        metric_name: Optional[str] = None,
+        days: Optional[int] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        order: Literal["asc", "desc"] = "desc",
+    ) -> Iterator[MetricEntryDb]:
+        """Stream metric entries for a user, one row at a time.
+
+        Same filtering and ordering as get_for_user, without materializing
+        the result.
+        """
+        query, params = self._user_query(
+            user_id, metric_name, days, start_date, end_date, order
+        )
+        for row in self.db.iter_execute(query, params):
+            yield _entry_from_row(row)
+
+    @staticmethod
+    def _user_query(
+        user_id: int,
+        metric_name: Optional[str],
+        days: Optional[int],
+        start_date: Optional[datetime],
+        end_date: Optional[datetime],
+        order: Literal["asc", "desc"] = "desc",
+    ) -> tuple[str, tuple]:
+        """Build the filtered entries query for get_for_user/iter_for_user.
+
+        Conditions are always appended in the same order so each filter
+        combination maps to one SQL string and reuses its cached statement.
+        """
         conditions = ["user_id = ?"]
         params = [user_id]
         if metric_name:
             conditions.append("metric_name = ?")
             params.append(metric_name)
         if days is not None:
-            cutoff = datetime.now() - timedelta(days=days)
             conditions.append("timestamp >= ?")
-            params.append(cutoff)
+            params.append(_cutoff(days))
         if start_date:
             conditions.append("timestamp >= ?")
-            params.append(start_date)
+            params.append(_sql_timestamp(start_date))
         if end_date:
             conditions.append("timestamp <= ?")
-            params.append(end_date)
+            params.append(_sql_timestamp(end_date))
         query = f"""
             SELECT * FROM metric_entries
             WHERE {" AND ".join(conditions)}
-            ORDER BY timestamp DESC
+            ORDER BY timestamp {"ASC" if order == "asc" else "DESC"}
         """
-        rows = self.db.execute(query, tuple(params))
-        return [MetricEntryDb(**row) for row in rows]
+        return query, tuple(params)
 
     def get_latest_for_metric(
         self, user_id: int, metric_name: str, limit: int = 1
     ) -> list[MetricEntryDb]:
         """Get the most recent entries for a specific metric."""
+        rows = self.db.execute(_SQL_LATEST, (user_id, metric_name, limit))
+        return [_entry_from_row(row) for row in rows]
+
+    def get_latest_per_metric(
+        self, user_id: int, metric_names: list[str], since: datetime
+    ) -> dict[str, MetricEntryDb]:
+        """Get the most recent entry since ``since`` for each metric.
+
+        One windowed query replaces a get_latest_for_metric call per
+        metric; metrics with no entry in the window are left out.
+        """
+        if not metric_names:
+            return {}
+        placeholders = ", ".join("?" * len(metric_names))
         rows = self.db.execute(
-            """
-            SELECT * FROM metric_entries
-            WHERE user_id = ? AND metric_name = ?
-            ORDER BY timestamp DESC
-            LIMIT ?
+            f"""
+            SELECT id, user_id, metric_name, timestamp, value_type,
+                   value_boolean, value_integer, value_decimal, value_text,
+                   word_count, metadata
+            FROM (
+                SELECT *, ROW_NUMBER() OVER (
+                    PARTITION BY metric_name ORDER BY timestamp DESC
+                ) AS rank
+                FROM metric_entries
+                WHERE user_id = ? AND metric_name IN ({placeholders})
+                AND timestamp >= ?
+            )
+            WHERE rank = 1
             """,
-            (user_id, metric_name, limit),
+            (user_id, *metric_names, _sql_timestamp(since)),
         )
-        return [MetricEntryDb(**row) for row in rows]
+        return {row["metric_name"]: _entry_from_row(row) for row in rows}
 
     def get_date_range_stats(self, user_id: int, metric_name: str, days: int) -> dict:
-        """Get basic statistics for a metric over a date range."""
-        cutoff = datetime.now() - timedelta(days=days)
+        """Get basic statistics for a metric over a date range.
+
+        Numeric aggregates are computed per value column; callers pick the
+        fields matching the metric's value type.
+        """
         row = self.db.execute_one(
             """
             SELECT
                 COUNT(*) as count,
                 MIN(timestamp) as first_date,
-                MAX(timestamp) as last_date
+                MAX(timestamp) as last_date,
+                AVG(value_integer) as avg_int,
+                SUM(value_integer) as sum_int,
+                MIN(value_integer) as min_int,
+                MAX(value_integer) as max_int,
+                AVG(value_decimal) as avg_dec,
+                SUM(value_decimal) as sum_dec,
+                MIN(value_decimal) as min_dec,
+                MAX(value_decimal) as max_dec,
+                SUM(CASE WHEN value_boolean = 1 THEN 1 ELSE 0 END) as true_count
             FROM metric_entries
             WHERE user_id = ? AND metric_name = ? AND timestamp >= ?
             """,
-            (user_id, metric_name, cutoff),
+            (user_id, metric_name, _cutoff(days)),
         )
         return (
-            row
+            dict(row)
             if row
             else {
                 "count": 0,
@@ -229,9 +566,52 @@ class MetricEntryRepository:
             }
         )
 
+    def aggregate_numeric(self, user_id: int, metric_name: str, days: int) -> dict:
+        """Aggregate decimal values for a metric over the last ``days`` days.
+
+        Returns count, total, average, min and max along with the latest
+        and oldest values in the window, all computed by SQLite.
+        """
+        params = (user_id, metric_name, _cutoff(days))
+        return dict(self.db.execute_one(_SQL_AGGREGATE_NUMERIC, params * 3))
+
+    def aggregate_categorical(
+        self, user_id: int, metric_name: str, days: int
+    ) -> dict[str, int]:
+        """Count each text value of a metric over the last ``days`` days.
+
+        Values are ordered by their most recent occurrence, newest first.
+        """
+        rows = self.db.execute(
+            _SQL_AGGREGATE_CATEGORICAL, (user_id, metric_name, _cutoff(days))
+        )
+        return {row["value_text"]: row["count"] for row in rows}
+
+    def count_yes_no(
+        self, user_id: int, metric_name: str, days: int, yes_value: str = "Yes"
+    ) -> tuple[int, int]:
+        """Count ``yes_value`` entries and all entries over the last ``days`` days.
+
+        Returns ``(yes_count, total)``.
+        """
+        row = self.db.execute_one(
+            _SQL_COUNT_YES_NO, (yes_value, user_id, metric_name, _cutoff(days))
+        )
+        return row["yes_count"], row["total"]
+
+    def get_text_summary(self, user_id: int, metric_name: str, days: int) -> dict:
+        """Summarize non-blank text entries over the last ``days`` days.
+
+        Returns count, total_words and the latest entry's text, computed
+        from the stored word counts without loading the entries.
+        """
+        params = (user_id, metric_name, _cutoff(days))
+        return dict(self.db.execute_one(_SQL_TEXT_SUMMARY, params * 2))
+
     def delete(self, entry_id: int) -> bool:
         """Delete a metric entry."""
         self.db.execute("DELETE FROM metric_entries WHERE id = ?", (entry_id,))
+        self._bump_version()
         return True
 
     def delete_for_user(self, user_id: int, metric_name: Optional[str] = None) -> int:
@@ -242,9 +622,7 @@ class MetricEntryRepository:
         else:
             query = "DELETE FROM metric_entries WHERE user_id = ?"
             params = (user_id,)
-        with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            deleted = cursor.rowcount
-            conn.commit()
+        with self.db.transaction() as conn:
+            deleted = conn.execute(query, params).rowcount
+        self._bump_version()
         return deleted
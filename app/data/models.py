@@ -3,11 +3,27 @@
 from datetime import datetime, date
 from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 from app.metrics.base import InputType
 
 
+_VALUE_ATTR: dict[InputType, str] = {
+    InputType.BOOLEAN: "value_boolean",
+    InputType.INTEGER: "value_integer",
+    InputType.DECIMAL: "value_decimal",
+    InputType.TEXT: "value_text",
+}
+
+
+_MODEL_CONFIG = ConfigDict(
+    from_attributes=True,
+    frozen=True,
+    extra="ignore",
+    validate_default=False,
+)
+
+
 class User(BaseModel):
     """User model"""
 
@@ -16,8 +32,7 @@ class User(BaseModel):
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes: bool = True
+    model_config = _MODEL_CONFIG
 
 
 class UserMetricConfig(BaseModel):
@@ -30,8 +45,7 @@ class UserMetricConfig(BaseModel):
     display_order: int = 0
     created_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes: bool = True
+    model_config = _MODEL_CONFIG
 
 
 class MetricEntryDb(BaseModel):
@@ -50,22 +64,15 @@ class MetricEntryDb(BaseModel):
     value_integer: Optional[int] = None
     value_decimal: Optional[float] = None
     value_text: Optional[str] = None
+    word_count: Optional[int] = None
     metadata: Optional[str] = None
 
-    class Config:
-        from_attributes: bool = True
+    model_config = _MODEL_CONFIG
 
     def get_value(self) -> Optional[object]:
         """Retrieve the value in its appropriate type based on value_type"""
-        if self.value_type == InputType.BOOLEAN:
-            return self.value_boolean
-        elif self.value_type == InputType.INTEGER:
-            return self.value_integer
-        elif self.value_type == InputType.DECIMAL:
-            return self.value_decimal
-        elif self.value_type == InputType.TEXT:
-            return self.value_text
-        return None
+        attr = _VALUE_ATTR.get(self.value_type)
+        return getattr(self, attr) if attr is not None else None
 
 
 class DailySummaryCache(BaseModel):
@@ -77,5 +84,4 @@ class DailySummaryCache(BaseModel):
     summary_content: str
     generated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes: bool = True
+    model_config = _MODEL_CONFIG
@@ -24,14 +24,22 @@ class SummaryCacheRepository:
             """,
             (user_id, cache_date.isoformat()),
         )
-        return DailySummaryCache(**row) if row else None
+        return DailySummaryCache.model_construct(**dict(row)) if row else None
 
     def create(self, user_id: int, cache_date: date, summary_content: str) -> int:
-        """Store a new cached summary. Returns the inserted ID."""
-        return self.db.execute_insert(
+        """Store the cached summary for a day, replacing any existing one.
+
+        Returns the row ID.
+        """
+        row = self.db.execute_one(
             """
             INSERT INTO daily_summary_cache (user_id, cache_date, summary_content, generated_at)
             VALUES (?, ?, ?, ?)
+            ON CONFLICT(user_id, cache_date) DO UPDATE SET
+                summary_content = excluded.summary_content,
+                generated_at = excluded.generated_at
+            RETURNING id
             """,
             (user_id, cache_date.isoformat(), summary_content, datetime.now()),
         )
+        return row["id"]
@@ -2,6 +2,7 @@
 
 from typing import Optional
 from datetime import datetime
+import threading
 
 from app.data.database import Database
 from app.data.models import User, UserMetricConfig
@@ -12,14 +13,23 @@ class UserRepository:
 
     def __init__(self, db: Database) -> None:
         self.db = db
+        # user_id -> enabled metric names; evicted whenever they change
+        self._enabled_cache: dict[int, tuple[str, ...]] = {}
+        # Bumped on every eviction so a read that raced a write is not cached
+        self._enabled_generation: int = 0
+        self._enabled_lock = threading.Lock()
 
     def create(self, name: str) -> User:
         """Create a new user."""
-        user_id = self.db.execute_insert(
-            "INSERT INTO users (name, created_at, updated_at) VALUES (?, ?, ?)",
-            (name, datetime.now(), datetime.now()),
+        now = datetime.now()
+        row = self.db.execute_one(
+            """
+            INSERT INTO users (name, created_at, updated_at) VALUES (?, ?, ?)
+            RETURNING *
+            """,
+            (name, now, now),
         )
-        return self.get_by_id(user_id)
+        return User(**row)
 
     def get_by_id(self, user_id: int) -> Optional[User]:
         """Retrieve a user by ID."""
@@ -38,19 +48,28 @@ class UserRepository:
 
     def update(self, user_id: int, name: str) -> Optional[User]:
         """Update a user's name"""
-        self.db.execute(
-            "UPDATE users SET name = ?, updated_at = ? WHERE id = ?",
+        row = self.db.execute_one(
+            "UPDATE users SET name = ?, updated_at = ? WHERE id = ? RETURNING *",
             (name, datetime.now(), user_id),
         )
-        return self.get_by_id(user_id)
+        return User(**row) if row else None
 
     def delete(self, user_id: int) -> bool:
         """Delete a user by ID."""
         self.db.execute("DELETE FROM users WHERE id = ?", (user_id,))
+        self._evict_enabled(user_id)
         return True
 
     def get_enabled_metrics(self, user_id: int) -> list[UserMetricConfig]:
-        """Get all enabled metrics for a user."""
+        """Get all enabled metrics for a user.
+
+        Results are cached per user until their metric settings change.
+        """
+        with self._enabled_lock:
+            cached = self._enabled_cache.get(user_id)
+            generation = self._enabled_generation
+        if cached is not None:
+            return list(cached)
         rows = self.db.execute(
             """
             SELECT metric_name 
@@ -60,7 +79,17 @@ class UserRepository:
             """,
             (user_id,),
         )
-        return [row["metric_name"] for row in rows]
+        names = tuple(row["metric_name"] for row in rows)
+        with self._enabled_lock:
+            if self._enabled_generation == generation:
+                self._enabled_cache[user_id] = names
+        return list(names)
+
+    def _evict_enabled(self, user_id: int) -> None:
+        """Drop a user's cached metric names after their settings change."""
+        with self._enabled_lock:
+            self._enabled_generation += 1
+            self._enabled_cache.pop(user_id, None)
 
     def set_metric_enabled(
         self,
@@ -69,33 +98,27 @@ class UserRepository:
         enabled: bool,
     ) -> None:
         """Enable or disable a metric for a user."""
-        existing = self.db.execute_one(
-            "SELECT id FROM user_metrics WHERE user_id = ? AND metric_name = ?",
-            (user_id, metric_name),
+        self.db.execute(
+            """
+            INSERT INTO user_metrics (user_id, metric_name, enabled)
+            VALUES (?, ?, ?)
+            ON CONFLICT(user_id, metric_name) DO UPDATE SET enabled = excluded.enabled
+            """,
+            (user_id, metric_name, enabled),
         )
-        if existing:
-            self.db.execute(
-                "UPDATE user_metrics SET enabled = ? WHERE user_id = ? AND metric_name = ?",
-                (enabled, user_id, metric_name),
-            )
-        else:
-            self.db.execute_insert(
-                "INSERT INTO user_metrics (user_id, metric_name, enabled) VALUES (?, ?, ?)",
-                (user_id, metric_name, enabled),
-            )
+        self._evict_enabled(user_id)
 
     def initialize_user_metrics(self, user_id: int, metric_names: list[str]) -> None:
-        """Initialize default metrics for a new user."""
-        for i, metric_name in enumerate(metric_names):
-            existing = self.db.execute_one(
-                "SELECT id FROM user_metrics WHERE user_id = ? AND metric_name = ?",
-                (user_id, metric_name),
-            )
-            if not existing:
-                self.db.execute_insert(
-                    """
-                    INSERT INTO user_metrics (user_id, metric_name, enabled, display_order) 
-                    VALUES (?, ?, 1, ?)
-                    """,
-                    (user_id, metric_name, i),
-                )
+        """Initialize default metrics for a new user.
+
+        Metrics the user already has a row for are left untouched.
+        """
+        self.db.execute_many(
+            """
+            INSERT OR IGNORE INTO user_metrics
+            (user_id, metric_name, enabled, display_order)
+            VALUES (?, ?, 1, ?)
+            """,
+            [(user_id, metric_name, i) for i, metric_name in enumerate(metric_names)],
+        )
+        self._evict_enabled(user_id)
@@ -9,6 +9,7 @@ from app.llm.base import (
     DailySummaryRequest,
     TrendAnalysisRequest,
 )
+from app.llm.cache import LlmCache
 
 
 __all__ = [
@@ -17,4 +18,5 @@ __all__ = [
     "LlmResponse",
     "DailySummaryRequest",
     "TrendAnalysisRequest",
+    "LlmCache",
 ]
@@ -4,8 +4,7 @@ from abc import ABC, abstractmethod
 from enum import StrEnum
 from typing import Any, Optional
 
-
-from pydantic import BaseModel
+import msgspec
 
 
 class Role(StrEnum):
@@ -16,28 +15,28 @@ class Role(StrEnum):
     ASSISTANT = "assistant"
 
 
-class LlmMessage(BaseModel):
+class LlmMessage(msgspec.Struct, frozen=True):
     """A single message in an LLM conversation"""
 
     role: Role
     content: str
 
 
-class LlmResponse(BaseModel):
+class LlmResponse(msgspec.Struct, frozen=True):
     """Response from an LLM query"""
 
     content: str
     metadata: Optional[dict[str, Any]] = None
 
 
-class DailySummaryRequest(BaseModel):
+class DailySummaryRequest(msgspec.Struct, frozen=True):
     """Request model for generating daily summaries"""
 
     user_id: int
     metrics_data: dict[str, Any]
 
 
-class TrendAnalysisRequest(BaseModel):
+class TrendAnalysisRequest(msgspec.Struct, frozen=True):
     """Request model for generating trend analysis"""
 
     user_id: int
@@ -0,0 +1,68 @@
+"""Exact-match response cache for LLM providers"""
+
+import hashlib
+import threading
+import time
+from typing import Any, Optional
+
+import msgspec
+
+from app.llm.base import LlmMessage, LlmResponse
+
+DEFAULT_TTL_SECONDS = 3600.0
+DEFAULT_MAX_ENTRIES = 256
+
+
+class LlmCache:
+    """In-memory cache of LLM responses keyed on the exact request.
+
+    The key is a SHA-256 of the model, the messages and the generation
+    options, so only byte-identical requests are served from the cache.
+    Entries expire after ``ttl_seconds``; once ``max_entries`` is reached
+    the oldest entry is evicted.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        self.ttl_seconds: float = ttl_seconds
+        self.max_entries: int = max_entries
+        self._entries: dict[str, tuple[float, LlmResponse]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(
+        model: str, messages: list[LlmMessage], options: Optional[dict[str, Any]]
+    ) -> str:
+        """Hash a request into a cache key"""
+        payload = msgspec.json.encode(
+            {"model": model, "messages": messages, "options": options or {}}
+        )
+        return hashlib.sha256(payload).hexdigest()
+
+    def get(self, key: str) -> Optional[LlmResponse]:
+        """Return the cached response for ``key``, if present and fresh"""
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is None:
+                return None
+            expires_at, response = cached
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            return response
+
+    def set(self, key: str, response: LlmResponse) -> None:
+        """Store a response under ``key``"""
+        with self._lock:
+            self._entries.pop(key, None)
+            if len(self._entries) >= self.max_entries:
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, response)
+
+    def clear(self) -> None:
+        """Drop every cached response"""
+        with self._lock:
+            self._entries.clear()
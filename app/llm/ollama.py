@@ -1,8 +1,13 @@
 """Ollama LLM implementation"""
 
-from typing import Any, Optional
+import time
+from typing import Any, Iterator, Optional
 
+import msgspec
+from msgspec.structs import replace
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException, Timeout
 
 from app.llm.base import (
@@ -13,6 +18,34 @@ from app.llm.base import (
     TrendAnalysisRequest,
     Role,
 )
+from app.llm.cache import LlmCache
+
+AVAILABILITY_TTL_SECONDS = 60.0
+
+_ROLE_PREFIX: dict[Role, str] = {
+    Role.SYSTEM: "System: ",
+    Role.USER: "User: ",
+    Role.ASSISTANT: "Assistant: ",
+}
+
+_DAILY_SYSTEM = LlmMessage(
+    role=Role.SYSTEM,
+    content=(
+        "You're a supportive health tracking assistant. "
+        "Provide brief, encouraging insights based on user data. "
+        "Keep responses to 1-2 friendly sentences. No lectures, "
+        "just positive observations."
+    ),
+)
+
+_TREND_SYSTEM = LlmMessage(
+    role=Role.SYSTEM,
+    content=(
+        "You are a data analysis assistant focused on health "
+        "metrics. Provide objective, actionable insights without "
+        "being preachy. Focus on patterns and observations."
+    ),
+)
 
 
 class OllamaLlm(LlmInterface):
@@ -23,75 +56,104 @@ class OllamaLlm(LlmInterface):
         host: str = "http://localhost:11434",
         model: str = "qwen3:4b",
         timeout: int = 30,
+        cache: Optional[LlmCache] = None,
     ) -> None:
         """Initialize the Ollama LLM provider"""
         self.host: str = host
         self.model: str = model
         self.timeout: int = timeout
-        self._available: Optional[bool] = None
+        self.cache: LlmCache = cache if cache is not None else LlmCache()
+        self._available: Optional[tuple[bool, float]] = None
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
 
     def is_available(self) -> bool:
-        """Check if the Ollama server is reachable"""
+        """Check if the Ollama server is reachable.
+
+        The result is cached for AVAILABILITY_TTL_SECONDS so a restarted
+        server is picked up without probing on every call.
+        """
+        now = time.monotonic()
         if self._available is not None:
-            return self._available
+            available, checked_at = self._available
+            if now - checked_at < AVAILABILITY_TTL_SECONDS:
+                return available
         try:
-            response = requests.get(f"{self.host}/api/tags", timeout=5)
-            self._available = response.status_code == 200
+            response = self._session.get(f"{self.host}/api/tags", timeout=5)
+            available = response.status_code == 200
         except RequestException:
-            self._available = False
-        return self._available
+            available = False
+        self._available = (available, now)
+        return available
 
     def _generate(
         self,
         messages: list[LlmMessage],
         max_tokens: int = 500,
-    ) -> str:
-        """Generate a response from the Ollama model"""
+    ) -> LlmResponse:
+        """Generate a response from the Ollama model.
+
+        The completion is streamed and assembled chunk by chunk, so text
+        starts arriving before the model has finished generating. A stream
+        that reports an error or ends without its done chunk is returned as a
+        ``stream_error``. Completed responses are cached, and an identical
+        request is answered from the cache without contacting the server.
+        """
+        options = {"num_predict": max_tokens, "temperature": 0.7}
+        cache_key = self.cache.make_key(self.model, messages, options)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return replace(cached, metadata={**(cached.metadata or {}), "cached": True})
         if not self.is_available():
             return LlmResponse(
                 content="LLM service is not available",
                 metadata={"error": "service_unavailable"},
             )
-        prompt_parts = []
-        for msg in messages:
-            if msg.role == Role.SYSTEM:
-                prompt_parts.append(f"System: {msg.content}")
-            elif msg.role == Role.USER:
-                prompt_parts.append(f"User: {msg.content}")
-            elif msg.role == Role.ASSISTANT:
-                prompt_parts.append(f"Assistant: {msg.content}")
-        prompt = "\n\n".join(prompt_parts) + "\n\nAssistant:"
+        prompt = (
+            "\n\n".join(_ROLE_PREFIX[msg.role] + msg.content for msg in messages)
+            + "\n\nAssistant:"
+        )
         try:
-            response = requests.post(
+            response = self._session.post(
                 f"{self.host}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "num_predict": max_tokens,
-                        "temperature": 0.7,
-                    },
-                },
+                data=msgspec.json.encode(
+                    {
+                        "model": self.model,
+                        "prompt": prompt,
+                        "stream": True,
+                        "options": options,
+                    }
+                ),
+                headers={"Content-Type": "application/json"},
                 timeout=self.timeout,
+                stream=True,
             )
-            if response.status_code != 200:
-                return LlmResponse(
-                    content=f"Ollama API error: {response.status_code}",
-                    metadata={
-                        "error": "api_error",
-                        "status_code": response.status_code,
-                    },
-                )
-            result: dict[str, str] = response.json()
-            content = result.get("response", "").strip()
-            return LlmResponse(
-                content=content,
-                metadata={
-                    "model": self.model,
-                    "done": result.get("done", False),
-                },
+            with response:
+                if response.status_code != 200:
+                    return LlmResponse(
+                        content=f"Ollama API error: {response.status_code}",
+                        metadata={
+                            "error": "api_error",
+                            "status_code": response.status_code,
+                        },
+                    )
+                parts = []
+                for chunk in self._iter_chunks(response):
+                    if "error" in chunk:
+                        return self._stream_error(str(chunk["error"]))
+                    parts.append(chunk.get("response", ""))
+                    if chunk.get("done"):
+                        break
+                else:
+                    return self._stream_error("stream ended before completion")
+            result = LlmResponse(
+                content="".join(parts).strip(),
+                metadata={"model": self.model, "done": True},
             )
+            self.cache.set(cache_key, result)
+            return result
         except Timeout:
             return LlmResponse(
                 content="LLM request timed out",
@@ -108,19 +170,26 @@ class OllamaLlm(LlmInterface):
                 metadata={"error": "unexpected_error"},
             )
 
+    @staticmethod
+    def _stream_error(detail: str) -> LlmResponse:
+        """Build the response for a stream that failed or stopped early"""
+        return LlmResponse(
+            content=f"LLM stream failed: {detail}",
+            metadata={"error": "stream_error", "detail": detail},
+        )
+
+    @staticmethod
+    def _iter_chunks(response: requests.Response) -> Iterator[dict[str, Any]]:
+        """Decode the newline-delimited JSON chunks of a streamed response"""
+        for line in response.iter_lines():
+            if line:
+                yield orjson.loads(line)
+
     def generate_daily_summary(self, request: DailySummaryRequest) -> LlmResponse:
         """Generate a daily summary based on metrics data"""
         metrics_summary = self._format_metrics_data(request.metrics_data)
         messages = [
-            LlmMessage(
-                role=Role.SYSTEM,
-                content=(
-                    "You're a supportive health tracking assistant. "
-                    "Provide brief, encouraging insights based on user data. "
-                    "Keep responses to 1-2 friendly sentences. No lectures, "
-                    "just positive observations."
-                ),
-            ),
+            _DAILY_SYSTEM,
             LlmMessage(
                 role=Role.USER,
                 content=(
@@ -136,14 +205,7 @@ class OllamaLlm(LlmInterface):
         """Analyze a trend based on metric data"""
         trend_summary = self._format_trend_data(request.trend_data, indent=2)
         messages = [
-            LlmMessage(
-                role=Role.SYSTEM,
-                content=(
-                    "You are a data analysis assistant focused on health "
-                    "metrics. Provide objective, actionable insights without "
-                    "being preachy. Focus on patterns and observations."
-                ),
-            ),
+            _TREND_SYSTEM,
             LlmMessage(
                 role=Role.USER,
                 content=(
@@ -3,10 +3,17 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
 from enum import StrEnum
-from typing import Any, Optional
+import functools
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Optional
 
 from pydantic import BaseModel
 
+if TYPE_CHECKING:
+    from app.data import Database, MetricEntryRepository
+    from app.data.entries import EntryRow
+
 
 class InputType(StrEnum):
     """Types of inputs for UI fields"""
@@ -63,6 +70,43 @@ class MetricAggregate(BaseModel):
     stats: dict[str, Any]
 
 
+WINDOW_CACHE_TTL_SECONDS = 300.0
+WINDOW_CACHE_MAX_SIZE = 1024
+
+# (method, database id, user_id, metric_name, days)
+#     -> (entry version, expires at, result)
+_WINDOW_CACHE: dict[tuple, tuple[int, float, Any]] = {}
+_WINDOW_CACHE_LOCK = threading.Lock()
+
+
+def cached_window(method: Callable) -> Callable:
+    """Cache a metric's ``(user_id, days)`` computation between writes.
+
+    A result is reused for WINDOW_CACHE_TTL_SECONDS, or until a metric
+    entry is written to the same database, whichever comes first.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, user_id: int, days: int):
+        entry_repo = self.entry_repo
+        key = (method.__name__, id(entry_repo.db), user_id, self.name, days)
+        version = entry_repo.version
+        now = time.monotonic()
+        with _WINDOW_CACHE_LOCK:
+            cached = _WINDOW_CACHE.get(key)
+        if cached is not None and cached[0] == version and cached[1] > now:
+            return cached[2]
+        result = method(self, user_id, days)
+        with _WINDOW_CACHE_LOCK:
+            if key not in _WINDOW_CACHE and len(_WINDOW_CACHE) >= WINDOW_CACHE_MAX_SIZE:
+                # Evict the oldest insertion to keep the cache bounded
+                _WINDOW_CACHE.pop(next(iter(_WINDOW_CACHE)))
+            _WINDOW_CACHE[key] = (version, now + WINDOW_CACHE_TTL_SECONDS, result)
+        return result
+
+    return wrapper
+
+
 class MetricBase(ABC):
     """Abstract base class for all metrics.
 
@@ -73,8 +117,27 @@ class MetricBase(ABC):
     - How to compute trends
     - How to generate aggregates
     - Optionally, custom LLM prompts
+
+    Metrics share one MetricEntryRepository when it is passed in; given
+    only a database, a metric builds its own.
     """
 
+    # Whether a new entry replaces one already logged the same day
+    replaces_same_day: bool = True
+
+    def __init__(
+        self,
+        db: Optional["Database"] = None,
+        entry_repo: Optional["MetricEntryRepository"] = None,
+    ) -> None:
+        if entry_repo is None and db is not None:
+            # Imported here; app.data depends on this module
+            from app.data import MetricEntryRepository
+
+            entry_repo = MetricEntryRepository(db)
+        self.db = db
+        self.entry_repo = entry_repo
+
     @property
     @abstractmethod
     def name(self) -> str:
@@ -106,14 +169,37 @@ class MetricBase(ABC):
         pass
 
     @abstractmethod
+    def build_insert_row(
+        self,
+        user_id: int,
+        value: Any,
+        timestamp: Optional[datetime] = None,
+    ) -> "EntryRow":
+        """Converts validated input into a row for MetricEntryRepository"""
+        pass
+
     def record(
         self,
         user_id: int,
         value: Any,
         timestamp: Optional[datetime] = None,
     ) -> MetricEntry:
-        """Records a new metric entry/log"""
-        pass
+        """Records a new metric entry/log.
+
+        Stores the row from build_insert_row, replacing the same day's entry
+        when replaces_same_day is set and adding another one otherwise.
+        """
+        row = self.build_insert_row(user_id, value, timestamp)
+        if self.replaces_same_day:
+            db_entry = self.entry_repo.create_or_update(*row)
+        else:
+            db_entry = self.entry_repo.create(*row)
+        return MetricEntry(
+            user_id=db_entry.user_id,
+            metric_name=db_entry.metric_name,
+            timestamp=db_entry.timestamp,
+            value=db_entry.get_value(),
+        )
 
     @abstractmethod
     def get_trends(
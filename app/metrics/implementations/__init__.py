@@ -4,9 +4,9 @@ This module imports all metric implementations and registers them
 with the global registry.
 """
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
-from app.data import Database
+from app.data import Database, MetricEntryRepository
 from app.metrics.implementations.alone import AloneTimeMetric
 from app.metrics.implementations.exercise import ExerciseMetric
 from app.metrics.implementations.groceries import GroceriesMetric
@@ -19,19 +19,27 @@ if TYPE_CHECKING:
     from app.metrics.base import MetricBase
 
 
-def register_all_metrics(db: Database) -> None:
-    """Register all available metric implementations."""
-    metrics: list[MetricBase] = [
-        NotesMetric(db),
-        GroceriesMetric(db),
-        ScaleMetric(db),
-        ExerciseMetric(db),
-        AloneTimeMetric(db),
-        MoodMetric(db),
+def register_all_metrics(
+    db: Database, entry_repo: Optional[MetricEntryRepository] = None
+) -> None:
+    """Register all available metric implementations.
+
+    Every metric shares ``entry_repo``, or one repository built for ``db``.
+    """
+    if entry_repo is None:
+        entry_repo = MetricEntryRepository(db)
+    metric_classes: list[type[MetricBase]] = [
+        NotesMetric,
+        GroceriesMetric,
+        ScaleMetric,
+        ExerciseMetric,
+        AloneTimeMetric,
+        MoodMetric,
     ]
-    for metric in metrics:
-        REGISTRY._instances[metric.name] = metric
-        REGISTRY._metrics[metric.name] = metric.__class__
+    metrics = [
+        metric_class(db=db, entry_repo=entry_repo) for metric_class in metric_classes
+    ]
+    REGISTRY.bulk_register(metrics)
 
 
 __all__ = [
@@ -3,16 +3,15 @@
 Track daily exercise completion.
 """
 
-from typing import Any, Optional
+from typing import Any
 
-from app.data import Database, MetricEntryRepository
 from app.metrics.base import (
     InputType,
     MetricAggregate,
     MetricBase,
-    MetricEntry,
     MetricInputSchema,
     MetricTrendData,
+    cached_window,
 )
 
 YES = "Yes"
@@ -22,93 +21,63 @@ NO = "No"
 class ExerciseMetric(MetricBase):
     """Track daily exercise"""
 
-    def __init__(self, db: Optional[Database] = None) -> None:
-        self.db = db
-        self._entry_repo = None
-
-    @property
-    def entry_repo(self) -> MetricEntryRepository:
-        """Lazy load the entry repository"""
-        if self._entry_repo is None and self.db is not None:
-            self._entry_repo = MetricEntryRepository(self.db)
-        return self._entry_repo
-
-    @property
-    def name(self):
-        return "exercise"
-
-    @property
-    def display_name(self):
-        return "Exercise"
-
-    @property
-    def description(self):
-        return "Did you exercise today?"
+    name = "exercise"
+    display_name = "Exercise"
+    description = "Did you exercise today?"
+    INPUT_SCHEMA = MetricInputSchema(
+        input_type=InputType.SELECT,
+        label="Did you exercise today?",
+        required=False,
+        options=[YES, NO],
+    )
 
     def input_schema(self):
-        return MetricInputSchema(
-            input_type=InputType.SELECT,
-            label="Did you exercise today?",
-            required=False,
-            options=[YES, NO],
-        )
+        return self.INPUT_SCHEMA
 
     def validate(self, value: Any) -> bool:
         """Validate yes/no input"""
         return value in [YES, NO]
 
-    def record(self, user_id, value, timestamp=None):
-        db_entry = self.entry_repo.create_or_update(
-            user_id=user_id,
-            metric_name=self.name,
-            value=value,
-            value_type=InputType.TEXT,
-            timestamp=timestamp,
-        )
-        return MetricEntry(
-            user_id=db_entry.user_id,
-            metric_name=db_entry.metric_name,
-            timestamp=db_entry.timestamp,
-            value=db_entry.value_text,
-        )
+    def build_insert_row(self, user_id, value, timestamp=None):
+        return (user_id, self.name, value, InputType.TEXT, timestamp, None)
 
+    @cached_window
     def get_trends(self, user_id, days):
         """Boolean trend over time"""
         entries = self.entry_repo.get_for_user(
-            user_id=user_id, metric_name=self.name, days=days
+            user_id=user_id, metric_name=self.name, days=days, order="asc"
         )
         data_points = [
             {
                 "timestamp": entry.timestamp.isoformat(),
                 "value": 1 if entry.value_text == YES else 0,
-                "date": entry.timestamp.strftime("%Y-%m-%d"),
+                "date": entry.timestamp.date().isoformat(),
                 "label": entry.value_text,
             }
-            for entry in reversed(entries)
+            for entry in entries
         ]
-        return MetricTrendData(
+        return MetricTrendData.model_construct(
             metric_name=self.name,
             time_range_days=days,
             data_points=data_points,
             trend_type="boolean",
         )
 
+    @cached_window
     def get_aggregates(self, user_id, days):
-        entries = self.entry_repo.get_for_user(
-            user_id=user_id, metric_name=self.name, days=days
+        yes_count, total_count = self.entry_repo.count_yes_no(
+            user_id, self.name, days, yes_value=YES
         )
-        if not entries:
-            return MetricAggregate(
+        if not total_count:
+            return MetricAggregate.model_construct(
                 metric_name=self.name,
                 time_range_days=days,
                 summary="No exercise data recorded.",
                 stats={"count": 0, "yes_count": 0, "percentage": 0},
             )
-        yes_count = sum(1 for e in entries if e.value_text == YES)
-        total_count = len(entries)
         percentage = (yes_count / total_count * 100) if total_count > 0 else 0
         summary = f"{yes_count}/{total_count} days exercised ({percentage:.0f}%)"
-        return MetricAggregate(
+        return MetricAggregate.model_construct(
             metric_name=self.name,
             time_range_days=days,
             summary=summary,
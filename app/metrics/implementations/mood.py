@@ -3,16 +3,16 @@
 Track daily mood.
 """
 
-from typing import Any, Optional
+from collections import Counter
+from typing import Any
 
-from app.data import Database, MetricEntryRepository
 from app.metrics.base import (
     InputType,
     MetricAggregate,
     MetricBase,
-    MetricEntry,
     MetricInputSchema,
     MetricTrendData,
+    cached_window,
 )
 
 GREAT = "Great"
@@ -28,110 +28,82 @@ class MoodMetric(MetricBase):
     MOOD_OPTIONS = [GREAT, GOOD, OKAY, POOR, BAD]
     MOOD_VALUES = {GREAT: 5, GOOD: 4, OKAY: 3, POOR: 2, BAD: 1}
 
-    def __init__(self, db: Optional[Database] = None) -> None:
-        self.db = db
-        self._entry_repo = None
-
-    @property
-    def entry_repo(self) -> MetricEntryRepository:
-        """Lazy load the entry repository"""
-        if self._entry_repo is None and self.db is not None:
-            self._entry_repo = MetricEntryRepository(self.db)
-        return self._entry_repo
-
-    @property
-    def name(self):
-        return "mood"
-
-    @property
-    def display_name(self):
-        return "Mood"
-
-    @property
-    def description(self):
-        return "How would you describe your mood today?"
+    name = "mood"
+    display_name = "Mood"
+    description = "How would you describe your mood today?"
+    INPUT_SCHEMA = MetricInputSchema(
+        input_type=InputType.SELECT,
+        label="How would you describe your mood today?",
+        required=False,
+        options=MOOD_OPTIONS,
+    )
 
     def input_schema(self):
-        return MetricInputSchema(
-            input_type=InputType.SELECT,
-            label="How would you describe your mood today?",
-            required=False,
-            options=self.MOOD_OPTIONS,
-        )
+        return self.INPUT_SCHEMA
 
     def validate(self, value: Any) -> bool:
         """Validate mood selection"""
         return value in self.MOOD_OPTIONS
 
-    def record(self, user_id, value, timestamp=None):
-        db_entry = self.entry_repo.create_or_update(
-            user_id=user_id,
-            metric_name=self.name,
-            value=value,
-            value_type=InputType.TEXT,
-            timestamp=timestamp,
-        )
-        return MetricEntry(
-            user_id=db_entry.user_id,
-            metric_name=db_entry.metric_name,
-            timestamp=db_entry.timestamp,
-            value=db_entry.value_text,
-        )
+    def build_insert_row(self, user_id, value, timestamp=None):
+        return (user_id, self.name, value, InputType.TEXT, timestamp, None)
 
+    @cached_window
     def get_trends(self, user_id, days):
         """Mood trend over time"""
         entries = self.entry_repo.get_for_user(
-            user_id=user_id, metric_name=self.name, days=days
+            user_id=user_id, metric_name=self.name, days=days, order="asc"
         )
+        mood_value = self.MOOD_VALUES.get
         data_points = [
             {
                 "timestamp": entry.timestamp.isoformat(),
-                "value": self.MOOD_VALUES.get(entry.value_text, 3),
-                "date": entry.timestamp.strftime("%Y-%m-%d"),
+                "value": mood_value(entry.value_text, 3),
+                "date": entry.timestamp.date().isoformat(),
                 "label": entry.value_text,
             }
-            for entry in reversed(entries)
+            for entry in entries
         ]
-        return MetricTrendData(
+        return MetricTrendData.model_construct(
             metric_name=self.name,
             time_range_days=days,
             data_points=data_points,
             trend_type="categorical",
         )
 
+    @cached_window
     def get_aggregates(self, user_id, days):
-        entries = self.entry_repo.get_for_user(
-            user_id=user_id, metric_name=self.name, days=days
+        mood_counts = Counter(
+            self.entry_repo.aggregate_categorical(user_id, self.name, days)
         )
-        if not entries:
-            return MetricAggregate(
+        if not mood_counts:
+            return MetricAggregate.model_construct(
                 metric_name=self.name,
                 time_range_days=days,
                 summary="No mood data recorded.",
                 stats={"count": 0},
             )
-        mood_counts = {}
-        for entry in entries:
-            mood = entry.value_text
-            mood_counts[mood] = mood_counts.get(mood, 0) + 1
-        most_common = max(mood_counts.items(), key=lambda x: x[1])
-        mood_values = [self.MOOD_VALUES.get(e.value_text, 3) for e in entries]
-        avg_value = sum(mood_values) / len(mood_values)
-        avg_mood = min(
-            self.MOOD_OPTIONS, key=lambda m: abs(self.MOOD_VALUES[m] - avg_value)
+        mood_values = self.MOOD_VALUES
+        total_count = mood_counts.total()
+        # Ties go to the first counted mood, i.e. the most recently logged
+        most_common = mood_counts.most_common(1)[0]
+        avg_value = (
+            sum(mood_values.get(mood, 3) * n for mood, n in mood_counts.items())
+            / total_count
         )
+        avg_mood = min(self.MOOD_OPTIONS, key=lambda m: abs(mood_values[m] - avg_value))
         summary = (
             f"Most common: {most_common[0]} ({most_common[1]}x) • Average: {avg_mood}"
         )
-        return MetricAggregate(
+        return MetricAggregate.model_construct(
             metric_name=self.name,
             time_range_days=days,
             summary=summary,
             stats={
-                "count": len(entries),
+                "count": total_count,
                 "most_common": most_common[0],
                 "most_common_count": most_common[1],
                 "average_mood": avg_mood,
-                "distribution": mood_counts,
+                "distribution": dict(mood_counts),
             },
         )
@@ -5,77 +5,47 @@ Freeform text notes for seeding LLM prompts.
 
 from typing import Any, Optional
 
-from app.data import Database, MetricEntryRepository
 from app.metrics.base import (
     InputType,
     MetricAggregate,
     MetricBase,
-    MetricEntry,
     MetricInputSchema,
     MetricTrendData,
+    cached_window,
 )
 
 
 class NotesMetric(MetricBase):
     """Track free-form daily notes"""
 
-    def __init__(self, db: Optional[Database] = None) -> None:
-        self.db = db
-        self._entry_repo = None
-
-    @property
-    def entry_repo(self) -> MetricEntryRepository:
-        """Lazy load the entry repository"""
-        if self._entry_repo is None and self.db is not None:
-            self._entry_repo = MetricEntryRepository(self.db)
-        return self._entry_repo
-
-    @property
-    def name(self):
-        return "notes"
-
-    @property
-    def display_name(self):
-        return "Notes"
-
-    @property
-    def description(self):
-        return "Any additional notes or observations?"
+    name = "notes"
+    display_name = "Notes"
+    description = "Any additional notes or observations?"
+    INPUT_SCHEMA = MetricInputSchema(
+        input_type=InputType.TEXT,
+        label="Any extra notes?",
+        required=False,
+        placeholder="How are you feeling? Any observations?",
+    )
 
     def input_schema(self):
-        return MetricInputSchema(
-            input_type=InputType.TEXT,
-            label="Any extra notes?",
-            required=False,
-            placeholder="How are you feeling? Any observations?",
-        )
+        return self.INPUT_SCHEMA
 
     def validate(self, value: Any) -> bool:
         """Notes are always valid (even empty strings)"""
         return True
 
-    def record(self, user_id, value, timestamp=None):
+    def build_insert_row(self, user_id, value, timestamp=None):
         note_text = str(value) if value else ""
         if not note_text.strip():
             note_text = ""
-        db_entry = self.entry_repo.create_or_update(
-            user_id=user_id,
-            metric_name=self.name,
-            value=note_text,
-            value_type=InputType.TEXT,
-            timestamp=timestamp,
-        )
-        return MetricEntry(
-            user_id=db_entry.user_id,
-            metric_name=db_entry.metric_name,
-            timestamp=db_entry.timestamp,
-            value=db_entry.value_text,
-        )
+        return (user_id, self.name, note_text, InputType.TEXT, timestamp, None)
 
+    @cached_window
     def get_trends(self, user_id, days):
         """Notes as a timeline"""
         entries = self.entry_repo.get_for_user(
-            user_id=user_id, metric_name=self.name, days=days
+            user_id=user_id, metric_name=self.name, days=days, order="asc"
         )
         entries_with_content = [
             e for e in entries if e.value_text and e.value_text.strip()
@@ -84,50 +54,42 @@ class NotesMetric(MetricBase):
             {
                 "timestamp": entry.timestamp.isoformat(),
                 "value": entry.value_text,
-                "date": entry.timestamp.strftime("%Y-%m-%d"),
+                "date": entry.timestamp.date().isoformat(),
                 "preview": entry.value_text[:100] + "..."
                 if len(entry.value_text) > 100
                 else entry.value_text,
             }
-            for entry in reversed(entries_with_content)
+            for entry in entries_with_content
         ]
-        return MetricTrendData(
+        return MetricTrendData.model_construct(
             metric_name=self.name,
             time_range_days=days,
             data_points=data_points,
             trend_type="text",
         )
 
+    @cached_window
     def get_aggregates(self, user_id, days):
-        entries = self.entry_repo.get_for_user(
-            user_id=user_id, metric_name=self.name, days=days
-        )
-        entries_with_content = [
-            e for e in entries if e.value_text and e.value_text.strip()
-        ]
-        if not entries_with_content:
-            return MetricAggregate(
+        stats = self.entry_repo.get_text_summary(user_id, self.name, days)
+        count = stats["count"]
+        if not count:
+            return MetricAggregate.model_construct(
                 metric_name=self.name,
                 time_range_days=days,
                 summary="No notes recorded.",
                 stats={"count": 0, "total_words": 0},
             )
-        total_words = sum(len(e.value_text.split()) for e in entries_with_content)
-        avg_words = (
-            total_words / len(entries_with_content) if entries_with_content else 0
-        )
-        recent_note = entries_with_content[0].value_text
+        total_words = stats["total_words"]
+        avg_words = total_words / count
+        recent_note = stats["latest_text"]
         preview = recent_note[:50] + "..." if len(recent_note) > 50 else recent_note
-        summary = (
-            f"{len(entries_with_content)} notes • ~{avg_words:.0f} "
-            f'words/note • Latest: "{preview}"'
-        )
-        return MetricAggregate(
+        summary = f'{count} notes • ~{avg_words:.0f} words/note • Latest: "{preview}"'
+        return MetricAggregate.model_construct(
             metric_name=self.name,
             time_range_days=days,
             summary=summary,
             stats={
-                "count": len(entries_with_content),
+                "count": count,
                 "total_words": total_words,
                 "avg_words_per_note": round(avg_words, 1),
                 "latest_preview": preview,
@@ -146,8 +108,8 @@ class NotesMetric(MetricBase):
             return None
         recent_notes = "\n".join(
             [
-                f"- {e.timestamp.strftime('%Y-%m-%d')}: {e.value_text}"
-                for e in reversed(entries_with_content[-5:])
+                f"- {e.timestamp.date().isoformat()}: {e.value_text}"
+                for e in entries_with_content[:-6:-1]
             ]
         )
         prompt = f"""Based on recent daily notes:
@@ -14,8 +14,10 @@ class MetricRegistry:
     """
 
     def __init__(self) -> None:
-        self._metrics: dict[str, MetricBase] = {}
+        self._metrics: dict[str, type[MetricBase]] = {}
         self._instances: dict[str, MetricBase] = {}
+        self._all_frozen: tuple[MetricBase, ...] = ()
+        self._enabled_cache: dict[tuple[str, ...], tuple[MetricBase, ...]] = {}
 
     def register(self, metric_class: type[MetricBase]) -> None:
         """Register a new metric class."""
@@ -23,6 +25,18 @@ class MetricRegistry:
         name = instance.name
         self._metrics[name] = metric_class
         self._instances[name] = instance
+        self._refresh()
+
+    def bulk_register(self, metrics: list[MetricBase]) -> None:
+        """Register already-constructed metric instances in one pass."""
+        self._instances.update({metric.name: metric for metric in metrics})
+        self._metrics.update({metric.name: type(metric) for metric in metrics})
+        self._refresh()
+
+    def _refresh(self) -> None:
+        """Rebuild the frozen views after the registered set changes."""
+        self._all_frozen = tuple(self._instances.values())
+        self._enabled_cache.clear()
 
     def get(self, name: str) -> MetricBase:
         """Get a metric instance by name."""
@@ -30,15 +44,23 @@ class MetricRegistry:
             raise KeyError(f"Metric '{name}' not found in registry.")
         return self._instances[name]
 
-    def get_all(self) -> list[MetricBase]:
+    def get_all(self) -> tuple[MetricBase, ...]:
         """Get all registered metric instances."""
-        return list(self._instances.values())
+        return self._all_frozen
+
+    def get_enabled(self, enabled_names: list[str]) -> tuple[MetricBase, ...]:
+        """Get all enabled metric instances.
 
-    def get_enabled(self, enabled_names: list[str]) -> list[MetricBase]:
-        """Get all enabled metric instances."""
-        return [
-            self._instances[name] for name in enabled_names if name in self._instances
-        ]
+        Results are memoized per distinct list of names.
+        """
+        key = tuple(enabled_names)
+        enabled = self._enabled_cache.get(key)
+        if enabled is None:
+            enabled = tuple(
+                self._instances[name] for name in key if name in self._instances
+            )
+            self._enabled_cache[key] = enabled
+        return enabled
 
     def is_registered(self, name: str) -> bool:
         """Check if a metric is registered."""
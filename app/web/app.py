@@ -1,7 +1,22 @@
 """Flask web application for metrics tracker."""
 
-from flask import Flask, render_template, request, redirect, url_for, jsonify, flash
-from datetime import datetime, date
+import atexit
+from concurrent.futures import Future, ThreadPoolExecutor
+import logging
+import threading
+
+from flask import (
+    Flask,
+    Response,
+    render_template,
+    request,
+    redirect,
+    url_for,
+    jsonify,
+    flash,
+)
+import orjson
+from datetime import datetime, date, time
 from pathlib import Path
 
 from app.config import load_config
@@ -15,22 +30,116 @@ from app.metrics.registry import REGISTRY
 from app.metrics.implementations import register_all_metrics
 from app.llm.ollama import OllamaLlm, DailySummaryRequest, LlmMessage, Role
 
+logger = logging.getLogger(__name__)
+
 app = Flask(__name__)
 app.secret_key = "dev-secret-key-change-in-production"
 config = load_config()
 db_path = Path(config.database.path)
 db_path.parent.mkdir(parents=True, exist_ok=True)
-db = Database(db_path)
+db = Database(
+    db_path,
+    journal_mode=config.database.journal_mode,
+    cache_size_kb=config.database.cache_size_kb,
+    mmap_size=config.database.mmap_size,
+)
 db.initialize()
+atexit.register(db.close)
 user_repo = UserRepository(db)
 entry_repo = MetricEntryRepository(db)
 summary_cache = SummaryCacheRepository(db)
-register_all_metrics(db)
+register_all_metrics(db, entry_repo=entry_repo)
+# Metric definitions are fixed once registered, so serialize them once
+_API_METRICS_JSON = orjson.dumps(
+    {
+        "metrics": [
+            {
+                "name": m.name,
+                "display_name": m.display_name,
+                "description": m.description,
+                "input_schema": m.input_schema().model_dump(mode="json"),
+            }
+            for m in REGISTRY.get_all()
+        ]
+    },
+    option=orjson.OPT_SORT_KEYS,
+)
 llm = OllamaLlm(
     host=config.llm.ollama_host,
     model=config.llm.ollama_model,
     timeout=config.llm.timeout_seconds,
 )
+# Daily summaries wait on the LLM, so they are generated off the request path
+summary_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="summary")
+atexit.register(summary_executor.shutdown, wait=False, cancel_futures=True)
+_pending_summaries: dict[tuple[int, date], Future] = {}
+_pending_lock = threading.Lock()
+
+
+def _get_enabled_metrics(user_id: int, initialize: bool = False) -> tuple:
+    """Resolve the metric instances a user has enabled.
+
+    Both lookups are cached: UserRepository keeps each user's names until
+    their settings change, and the registry memoizes instances per list of
+    names. With ``initialize``, a user with nothing enabled is given the
+    configured defaults.
+    """
+    names = user_repo.get_enabled_metrics(user_id)
+    if not names and initialize:
+        names = config.metrics.enabled_metrics
+        user_repo.initialize_user_metrics(user_id, names)
+    return REGISTRY.get_enabled(names)
+
+
+def _collect_aggregates(metrics, user_id: int, days: int) -> list:
+    """Pair each metric with its aggregate over the window, skipping failures.
+
+    Each metric answers from its windowed result cache or a single scalar
+    SQL query, so this stays cheap to call per request.
+    """
+    aggregates = []
+    for metric in metrics:
+        try:
+            aggregates.append((metric, metric.get_aggregates(user_id, days=days)))
+        except Exception as e:
+            logger.warning("Error getting aggregates for %s: %s", metric.name, e)
+    return aggregates
+
+
+def _build_and_cache_summary(user_id: int, today: date) -> None:
+    """Generate a user's daily summary and store it in the summary cache."""
+    try:
+        enabled_metrics = _get_enabled_metrics(user_id)
+        metrics_data = {
+            metric.name: {"summary": agg.summary, "stats": agg.stats}
+            for metric, agg in _collect_aggregates(enabled_metrics, user_id, 7)
+        }
+        if metrics_data:
+            summary_request = DailySummaryRequest(
+                user_id=user_id,
+                metrics_data=metrics_data,
+            )
+            response = llm.generate_daily_summary(summary_request)
+            if response.content and "error" not in response.metadata:
+                summary_cache.create(user_id, today, response.content.strip())
+    except Exception as e:
+        logger.warning("Error generating daily summary for user %s: %s", user_id, e)
+
+
+def _start_daily_summary(user_id: int, today: date) -> None:
+    """Queue summary generation unless it is already running for the day."""
+    key = (user_id, today)
+    with _pending_lock:
+        if key in _pending_summaries:
+            return
+        future = summary_executor.submit(_build_and_cache_summary, user_id, today)
+        _pending_summaries[key] = future
+    future.add_done_callback(lambda _: _pending_summaries.pop(key, None))
+
+
+def _summary_pending(user_id: int, today: date) -> bool:
+    """Whether a summary for the day is still being generated."""
+    return (user_id, today) in _pending_summaries
 
 
 @app.route("/")
@@ -47,81 +156,83 @@ def user_dashboard(user_id):
     if not user:
         flash("User not found", "error")
         return redirect(url_for("index"))
-    enabled_metric_names = user_repo.get_enabled_metrics(user_id)
-    if not enabled_metric_names:
-        enabled_metric_names = config.metrics.enabled_metrics
-        user_repo.initialize_user_metrics(user_id, enabled_metric_names)
-    enabled_metrics = REGISTRY.get_enabled(enabled_metric_names)
-    today_entries = {}
-    for metric in enabled_metrics:
-        latest = entry_repo.get_latest_for_metric(
-            user_id,
-            metric.name,
-            limit=1,
-        )
-        if latest:
-            latest_entry = latest[0]
-            if latest_entry.timestamp.date() == datetime.now().date():
-                today_entries[metric.name] = latest_entry.get_value()
-    daily_message = None
+    enabled_metrics = _get_enabled_metrics(user_id, initialize=True)
     today = date.today()
+    today_start = datetime.combine(today, time.min)
+    latest_map = entry_repo.get_latest_per_metric(
+        user_id, [m.name for m in enabled_metrics], today_start
+    )
+    today_entries = {name: e.get_value() for name, e in latest_map.items()}
+    daily_message = None
+    summary_pending = False
+    llm_ok = llm.is_available()
     cached = summary_cache.get_for_user_date(user_id, today)
     if cached:
         daily_message = cached.summary_content
-    elif llm.is_available():
-        try:
-            metrics_data = {}
-            for metric in enabled_metrics:
-                try:
-                    agg = metric.get_aggregates(user_id, days=7)
-                    metrics_data[metric.name] = {
-                        "summary": agg.summary,
-                        "stats": agg.stats,
-                    }
-                except Exception:
-                    pass
-            if metrics_data:
-                summary_request = DailySummaryRequest(
-                    user_id=user_id,
-                    metrics_data=metrics_data,
-                )
-                response = llm.generate_daily_summary(summary_request)
-                if response.content and "error" not in response.metadata:
-                    daily_message = response.content.strip()
-                    summary_cache.create(user_id, today, daily_message)
-        except Exception as e:
-            print(f"Error generating daily summary: {e}")
+    elif llm_ok and enabled_metrics:
+        _start_daily_summary(user_id, today)
+        summary_pending = True
     return render_template(
         "dashboard.html",
         user=user,
         metrics=enabled_metrics,
         today_entries=today_entries,
         daily_message=daily_message,
-        llm_available=llm.is_available(),
+        summary_pending=summary_pending,
+        llm_available=llm_ok,
     )
 
 
+@app.route("/user/<int:user_id>/daily-summary")
+def daily_summary(user_id: int):
+    """Today's cached summary, or whether it's still being generated."""
+    today = date.today()
+    cached = summary_cache.get_for_user_date(user_id, today)
+    if cached:
+        return jsonify({"summary": cached.summary_content, "pending": False})
+    return jsonify({"summary": None, "pending": _summary_pending(user_id, today)})
+
+
+@app.route("/user/<int:user_id>/daily-summary/generate", methods=["POST"])
+def generate_daily_summary(user_id: int):
+    """Queue generation of today's summary in the background."""
+    user = user_repo.get_by_id(user_id)
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+    today = date.today()
+    cached = summary_cache.get_for_user_date(user_id, today)
+    if cached:
+        return jsonify({"summary": cached.summary_content, "pending": False})
+    if not llm.is_available():
+        return jsonify({"error": "LLM service is not available"}), 503
+    _start_daily_summary(user_id, today)
+    return jsonify({"summary": None, "pending": True}), 202
+
+
 @app.route("/user/<int:user_id>/submit", methods=["POST"])
 def submit_entries(user_id):
     """Submit daily metric entries."""
     user = user_repo.get_by_id(user_id)
     if not user:
         return jsonify({"error": "User not found"}), 404
-    enabled_metric_names = user_repo.get_enabled_metrics(user_id)
-    enabled_metrics = REGISTRY.get_enabled(enabled_metric_names)
+    enabled_metrics = _get_enabled_metrics(user_id)
     results = []
     timestamp = datetime.now()
+    upserts = []
+    inserts = []
     for metric in enabled_metrics:
         field_name = f"metric_{metric.name}"
-        if metric.input_schema().input_type == "boolean":
+        is_boolean = metric.input_schema().input_type == "boolean"
+        if is_boolean:
             value = field_name in request.form
         else:
             value = request.form.get(field_name, "").strip()
-        if not value and metric.input_schema().input_type != "boolean":
+        if not value and not is_boolean:
             continue
         try:
             if metric.validate(value):
-                metric.record(user_id, value, timestamp=timestamp)
+                row = metric.build_insert_row(user_id, value, timestamp=timestamp)
+                (upserts if metric.replaces_same_day else inserts).append(row)
                 results.append({"metric": metric.name, "success": True, "value": value})
             else:
                 results.append(
@@ -129,6 +240,15 @@ def submit_entries(user_id):
                 )
         except Exception as e:
             results.append({"metric": metric.name, "success": False, "error": str(e)})
+    try:
+        with db.transaction():
+            entry_repo.bulk_upsert(upserts)
+            entry_repo.create_many(inserts)
+    except Exception as e:
+        # The batch is all-or-nothing, so nothing validated was stored
+        for result in results:
+            if result["success"]:
+                result.update(success=False, error=str(e))
     success_count = sum(1 for r in results if r["success"])
     if success_count > 0:
         flash(f"Successfully logged {success_count} metric(s)!", "success")
@@ -145,8 +265,7 @@ def user_trends(user_id):
         flash("User not found", "error")
         return redirect(url_for("index"))
     days = request.args.get("days", 7, type=int)
-    enabled_metric_names = user_repo.get_enabled_metrics(user_id)
-    enabled_metrics = REGISTRY.get_enabled(enabled_metric_names)
+    enabled_metrics = _get_enabled_metrics(user_id)
     metric_data = []
     for metric in enabled_metrics:
         try:
@@ -156,7 +275,7 @@ def user_trends(user_id):
                 {"metric": metric, "aggregates": aggregates, "trends": trends}
             )
         except Exception as e:
-            print(f"Error getting data for {metric.name}: {e}")
+            logger.warning("Error getting data for %s: %s", metric.name, e)
     return render_template("trends.html", user=user, metric_data=metric_data, days=days)
 
 
@@ -218,20 +337,7 @@ def toggle_metric(user_id):
 @app.route("/api/metrics")
 def api_metrics():
     """API endpoint to get available metrics."""
-    all_metrics = REGISTRY.get_all()
-    return jsonify(
-        {
-            "metrics": [
-                {
-                    "name": m.name,
-                    "display_name": m.display_name,
-                    "description": m.description,
-                    "input_schema": m.input_schema().model_dump(),
-                }
-                for m in all_metrics
-            ]
-        }
-    )
+    return Response(_API_METRICS_JSON, mimetype="application/json")
 
 
 @app.route("/user/<int:user_id>/llm/ask", methods=["POST"])
@@ -245,16 +351,12 @@ def llm_ask(user_id: int):
     question = request.json.get("question", "").strip()
     if not question:
         return jsonify({"error": "Question is required"}), 400
-    enabled_metric_names = user_repo.get_enabled_metrics(user_id)
-    enabled_metrics = REGISTRY.get_enabled(enabled_metric_names)
-    context_parts = []
-    for metric in enabled_metrics:
-        try:
-            agg = metric.get_aggregates(user_id, days=30)
-            if agg.stats.get("count", 0) > 0:
-                context_parts.append(f"- {metric.display_name}: {agg.summary}")
-        except Exception:
-            pass
+    enabled_metrics = _get_enabled_metrics(user_id)
+    context_parts = [
+        f"- {metric.display_name}: {agg.summary}"
+        for metric, agg in _collect_aggregates(enabled_metrics, user_id, 30)
+        if agg.stats.get("count", 0) > 0
+    ]
     context = "\n".join(context_parts) if context_parts else "No recent data available."
     messages = [
         LlmMessage(
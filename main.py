@@ -2,7 +2,11 @@
 Startup script for the Compass web application.
 """
 
+import atexit
+import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
 project_root = Path(__file__).parent
@@ -10,7 +14,18 @@ sys.path.insert(0, str(project_root))
 
 from app.web.app import app, config
 
+
+def configure_logging() -> None:
+    """Route log records through a queue so request threads never block on I/O"""
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, logging.StreamHandler())
+    logging.basicConfig(level=logging.INFO, handlers=[QueueHandler(log_queue)])
+    listener.start()
+    atexit.register(listener.stop)
+
+
 if __name__ == "__main__":
+    configure_logging()
     print("=" * 60)
     print("Starting Compass...")
     print("=" * 60)
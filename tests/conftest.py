@@ -0,0 +1,62 @@
+"""Shared fixtures for the test suite"""
+
+import orjson
+import pytest
+
+from app.data import Database, MetricEntryRepository, UserRepository
+from app.llm.ollama import OllamaLlm
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database(tmp_path / "test.db")
+    database.initialize()
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def repo(db):
+    return MetricEntryRepository(db)
+
+
+@pytest.fixture
+def user_id(db):
+    return UserRepository(db).create("tester").id
+
+
+class FakeStreamResponse:
+    def __init__(self, chunks, status_code=200):
+        self.status_code = status_code
+        self._chunks = chunks
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return None
+
+    def iter_lines(self):
+        for chunk in self._chunks:
+            yield orjson.dumps(chunk)
+
+
+class FakeSession:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.posts = 0
+
+    def post(self, *args, **kwargs):
+        self.posts += 1
+        return FakeStreamResponse(self.chunks)
+
+
+@pytest.fixture
+def make_llm(monkeypatch):
+    def make(chunks):
+        llm = OllamaLlm()
+        llm._session = FakeSession(chunks)
+        monkeypatch.setattr(llm, "is_available", lambda: True)
+        return llm
+
+    return make
@@ -0,0 +1,128 @@
+"""Tests for the SQL aggregates in MetricEntryRepository.
+
+Each aggregate is checked against the Python computation the metrics ran
+over get_for_user before it moved into SQL.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.metrics.base import InputType
+from app.metrics.implementations.mood import MoodMetric
+
+
+def _reference_numeric(repo, user_id, metric_name, days):
+    entries = repo.get_for_user(user_id=user_id, metric_name=metric_name, days=days)
+    values = [e.value_decimal for e in entries]
+    return {
+        "count": len(values),
+        "total": sum(values),
+        "average": sum(values) / len(values),
+        "min": min(values),
+        "max": max(values),
+        "latest": values[0],
+        "oldest": values[-1],
+    }
+
+
+def _reference_categorical(repo, user_id, metric_name, days):
+    entries = repo.get_for_user(user_id=user_id, metric_name=metric_name, days=days)
+    counts = {}
+    for entry in entries:
+        counts[entry.value_text] = counts.get(entry.value_text, 0) + 1
+    return counts
+
+
+@pytest.fixture
+def now():
+    return datetime.now().replace(microsecond=0)
+
+
+def test_aggregate_numeric_matches_python(repo, user_id, now):
+    values = [80.0, 81.5, 79.25, 82.0, 80.5]
+    for days_ago, value in enumerate(values):
+        repo.create(
+            user_id, "scale", value, InputType.DECIMAL, now - timedelta(days=days_ago)
+        )
+    # Outside the window, and another metric, must both be ignored
+    repo.create(user_id, "scale", 500.0, InputType.DECIMAL, now - timedelta(days=30))
+    repo.create(user_id, "alone", 3.0, InputType.DECIMAL, now)
+
+    result = repo.aggregate_numeric(user_id, "scale", 7)
+
+    assert result == pytest.approx(_reference_numeric(repo, user_id, "scale", 7))
+    assert result["latest"] == 80.0
+    assert result["oldest"] == 80.5
+
+
+def test_aggregate_numeric_empty_window(repo, user_id, now):
+    repo.create(user_id, "scale", 80.0, InputType.DECIMAL, now - timedelta(days=30))
+
+    result = repo.aggregate_numeric(user_id, "scale", 7)
+
+    assert result["count"] == 0
+    for key in ("total", "average", "min", "max", "latest", "oldest"):
+        assert result[key] is None
+
+
+def test_aggregate_categorical_matches_python(repo, user_id, now):
+    moods = ["Good", "Okay", "Good", "Bad", "Okay", "Great"]
+    for days_ago, mood in enumerate(moods):
+        repo.create(
+            user_id, "mood", mood, InputType.TEXT, now - timedelta(days=days_ago)
+        )
+    repo.create(user_id, "mood", "Bad", InputType.TEXT, now - timedelta(days=30))
+
+    result = repo.aggregate_categorical(user_id, "mood", 7)
+
+    expected = _reference_categorical(repo, user_id, "mood", 7)
+    assert result == expected
+    assert list(result) == list(expected)
+
+
+def test_aggregate_categorical_orders_ties_most_recent_first(repo, user_id, now):
+    # Okay and Good tie at two each; Okay was logged most recently
+    for days_ago, mood in enumerate(["Okay", "Good", "Good", "Okay"]):
+        repo.create(
+            user_id, "mood", mood, InputType.TEXT, now - timedelta(days=days_ago)
+        )
+
+    result = repo.aggregate_categorical(user_id, "mood", 7)
+
+    assert list(result.items()) == [("Okay", 2), ("Good", 2)]
+    reference = _reference_categorical(repo, user_id, "mood", 7)
+    assert max(result.items(), key=lambda x: x[1]) == max(
+        reference.items(), key=lambda x: x[1]
+    )
+
+
+def test_aggregate_categorical_empty_window(repo, user_id):
+    assert repo.aggregate_categorical(user_id, "mood", 7) == {}
+
+
+def test_count_yes_no_matches_python(repo, user_id, now):
+    answers = ["Yes", "No", "Yes", "Yes", "No"]
+    for days_ago, answer in enumerate(answers):
+        repo.create(
+            user_id, "exercise", answer, InputType.TEXT, now - timedelta(days=days_ago)
+        )
+    repo.create(user_id, "exercise", "Yes", InputType.TEXT, now - timedelta(days=30))
+
+    entries = repo.get_for_user(user_id=user_id, metric_name="exercise", days=7)
+    expected = (sum(1 for e in entries if e.value_text == "Yes"), len(entries))
+    assert repo.count_yes_no(user_id, "exercise", 7) == expected == (3, 5)
+    assert repo.count_yes_no(user_id, "groceries", 7) == (0, 0)
+
+
+def test_mood_most_common_tie_goes_to_most_recent(db, repo, user_id, now):
+    for days_ago, mood in enumerate(["Okay", "Good", "Good", "Okay"]):
+        repo.create(
+            user_id, "mood", mood, InputType.TEXT, now - timedelta(days=days_ago)
+        )
+
+    stats = MoodMetric(db=db, entry_repo=repo).get_aggregates(user_id, 7).stats
+
+    assert stats["most_common"] == "Okay"
+    assert stats["most_common_count"] == 2
+    assert stats["distribution"] == {"Okay": 2, "Good": 2}
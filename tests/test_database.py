@@ -0,0 +1,139 @@
+"""Tests for the shared-connection Database helpers and transactions"""
+
+import sqlite3
+import threading
+
+import pytest
+
+from app.data import UserRepository
+from app.metrics.base import InputType
+
+
+def _acquire_from_other_thread(lock) -> bool:
+    result = {}
+
+    def probe():
+        result["acquired"] = lock.acquire(timeout=2)
+        if result["acquired"]:
+            lock.release()
+
+    thread = threading.Thread(target=probe)
+    thread.start()
+    thread.join()
+    return result["acquired"]
+
+
+def test_iter_execute_yields_every_row_across_batches(db, repo, user_id):
+    repo.create_many(
+        [(user_id, "notes", f"note {i}", InputType.TEXT, None, None) for i in range(7)]
+    )
+
+    rows = list(
+        db.iter_execute(
+            "SELECT value_text FROM metric_entries WHERE user_id = ? ORDER BY id",
+            (user_id,),
+            batch_size=3,
+        )
+    )
+
+    assert [row["value_text"] for row in rows] == [f"note {i}" for i in range(7)]
+
+
+def test_partly_consumed_iterator_does_not_hold_the_lock(db, repo, user_id):
+    repo.create_many(
+        [(user_id, "notes", f"note {i}", InputType.TEXT, None, None) for i in range(5)]
+    )
+    entries = repo.iter_for_user(user_id)
+    next(entries)
+
+    assert _acquire_from_other_thread(db._lock)
+
+    closer = threading.Thread(target=entries.close)
+    closer.start()
+    closer.join()
+    assert _acquire_from_other_thread(db._lock)
+
+
+class Boom(Exception):
+    pass
+
+
+def _committed_names(db):
+    """User names visible to a separate connection, i.e. committed ones"""
+    conn = sqlite3.connect(db.db_path)
+    try:
+        return [row[0] for row in conn.execute("SELECT name FROM users ORDER BY id")]
+    finally:
+        conn.close()
+
+
+def _insert_user(conn, name):
+    conn.execute("INSERT INTO users (name) VALUES (?)", (name,))
+
+
+def test_transaction_commits_on_success(db):
+    with db.transaction() as conn:
+        _insert_user(conn, "alice")
+        _insert_user(conn, "bob")
+        assert _committed_names(db) == []
+
+    assert _committed_names(db) == ["alice", "bob"]
+    assert not db._in_transaction
+
+
+def test_transaction_rolls_back_when_block_raises(db):
+    with pytest.raises(Boom):
+        with db.transaction() as conn:
+            _insert_user(conn, "alice")
+            raise Boom
+
+    assert _committed_names(db) == []
+    assert db.execute("SELECT name FROM users") == []
+    assert not db._in_transaction
+
+
+def test_nested_transaction_joins_outer(db):
+    with pytest.raises(Boom):
+        with db.transaction() as outer:
+            _insert_user(outer, "alice")
+            with db.transaction() as inner:
+                assert inner is outer
+                _insert_user(inner, "bob")
+            # Leaving the inner block neither commits nor ends the transaction
+            assert db._in_transaction
+            assert _committed_names(db) == []
+            raise Boom
+
+    assert _committed_names(db) == []
+
+
+def test_execute_helpers_skip_commit_inside_transaction(db):
+    with pytest.raises(Boom):
+        with db.transaction():
+            db.execute("INSERT INTO users (name) VALUES (?)", ("alice",))
+            db.execute_insert("INSERT INTO users (name) VALUES (?)", ("bob",))
+            db.execute_many(
+                "INSERT INTO users (name) VALUES (?)", [("carol",), ("dave",)]
+            )
+            assert _committed_names(db) == []
+            raise Boom
+
+    assert _committed_names(db) == []
+
+
+def test_execute_helpers_commit_outside_transaction(db):
+    db.execute_insert("INSERT INTO users (name) VALUES (?)", ("alice",))
+
+    assert _committed_names(db) == ["alice"]
+
+
+def test_failed_statement_inside_transaction_leaves_rollback_to_owner(db):
+    UserRepository(db).create("alice")
+
+    with db.transaction() as conn:
+        _insert_user(conn, "bob")
+        with pytest.raises(sqlite3.IntegrityError):
+            db.execute("INSERT INTO users (name) VALUES (?)", ("alice",))
+        _insert_user(conn, "carol")
+
+    assert _committed_names(db) == ["alice", "bob", "carol"]
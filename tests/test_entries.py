@@ -0,0 +1,123 @@
+"""Tests for MetricEntryRepository batch writes"""
+
+from datetime import datetime, timedelta
+
+from app.data import UserRepository
+from app.metrics.base import InputType
+
+
+def test_bulk_upsert_updates_same_day_entry(repo, user_id):
+    morning = datetime(2025, 1, 15, 8, 0)
+    repo.create(user_id, "mood", "Okay", InputType.TEXT, morning)
+
+    written = repo.bulk_upsert(
+        [(user_id, "mood", "Great", InputType.TEXT, morning.replace(hour=20), None)]
+    )
+
+    entries = repo.get_for_user(user_id, metric_name="mood")
+    assert written == 1
+    assert [e.value_text for e in entries] == ["Great"]
+    assert entries[0].timestamp == morning.replace(hour=20)
+
+
+def test_bulk_upsert_inserts_when_day_has_no_entry(repo, user_id):
+    today = datetime(2025, 1, 15, 8, 0)
+    repo.create(user_id, "mood", "Okay", InputType.TEXT, today - timedelta(days=1))
+
+    written = repo.bulk_upsert(
+        [
+            (user_id, "mood", "Good", InputType.TEXT, today, None),
+            (user_id, "scale", 72.5, InputType.DECIMAL, today, None),
+        ]
+    )
+
+    assert written == 2
+    moods = repo.get_for_user(user_id, metric_name="mood", order="asc")
+    assert [e.value_text for e in moods] == ["Okay", "Good"]
+    scales = repo.get_for_user(user_id, metric_name="scale")
+    assert [e.value_decimal for e in scales] == [72.5]
+
+
+def test_bulk_upsert_replaces_only_latest_same_day_entry(repo, user_id):
+    day = datetime(2025, 1, 15)
+    repo.create(user_id, "notes", "first", InputType.TEXT, day.replace(hour=8))
+    repo.create(user_id, "notes", "second", InputType.TEXT, day.replace(hour=12))
+
+    repo.bulk_upsert(
+        [(user_id, "notes", "third", InputType.TEXT, day.replace(hour=20), None)]
+    )
+
+    notes = repo.get_for_user(user_id, metric_name="notes", order="asc")
+    assert [e.value_text for e in notes] == ["first", "third"]
+    assert notes[1].word_count == 1
+
+
+def test_bulk_upsert_matches_create_or_update(db, repo, user_id):
+    day = datetime(2025, 1, 15, 9, 0)
+    other = UserRepository(db).create("other").id
+    for uid in (user_id, other):
+        repo.create(uid, "exercise", "No", InputType.TEXT, day)
+
+    repo.bulk_upsert([(user_id, "exercise", "Yes", InputType.TEXT, day, None)])
+    repo.create_or_update(other, "exercise", "Yes", InputType.TEXT, day)
+
+    def stored(uid):
+        return [
+            (e.timestamp, e.value_text)
+            for e in repo.get_for_user(uid, metric_name="exercise")
+        ]
+
+    assert stored(user_id) == stored(other)
+
+
+def test_bulk_upsert_with_no_rows_writes_nothing(repo):
+    version = repo.version
+    assert repo.bulk_upsert([]) == 0
+    assert repo.version == version
+
+
+def test_create_many_inserts_every_row(repo, user_id):
+    day = datetime(2025, 1, 15, 9, 0)
+
+    inserted = repo.create_many(
+        [
+            (user_id, "alone", 1.5, InputType.DECIMAL, day, None),
+            (user_id, "alone", 2.0, InputType.DECIMAL, day.replace(hour=18), None),
+        ]
+    )
+
+    assert inserted == 2
+    stored = repo.get_for_user(user_id, metric_name="alone", order="asc")
+    assert [e.value_decimal for e in stored] == [1.5, 2.0]
+
+
+def test_create_many_with_no_rows_writes_nothing(repo):
+    version = repo.version
+    assert repo.create_many([]) == 0
+    assert repo.version == version
+
+
+def test_bulk_upsert_keeps_last_row_for_same_day(db, repo, user_id):
+    day = datetime(2025, 1, 15)
+    other = UserRepository(db).create("other").id
+    batch = [
+        ("mood", "Okay", day.replace(hour=8)),
+        ("mood", "Great", day.replace(hour=12)),
+        ("mood", "Good", day.replace(hour=10)),
+    ]
+
+    written = repo.bulk_upsert(
+        [(user_id, name, value, InputType.TEXT, ts, None) for name, value, ts in batch]
+    )
+    for name, value, ts in batch:
+        repo.create_or_update(other, name, value, InputType.TEXT, ts)
+
+    assert written == 1
+    stored = repo.get_for_user(user_id, metric_name="mood")
+    assert [(e.timestamp, e.value_text) for e in stored] == [
+        (day.replace(hour=10), "Good")
+    ]
+    assert [
+        (e.timestamp, e.value_text)
+        for e in repo.get_for_user(other, metric_name="mood")
+    ] == [(e.timestamp, e.value_text) for e in stored]
@@ -0,0 +1,88 @@
+"""Tests for the exact-match LLM response cache"""
+
+import pytest
+
+from app.llm import cache as cache_module
+from app.llm.base import LlmMessage, LlmResponse, Role
+from app.llm.cache import LlmCache
+
+OPTIONS = {"num_predict": 150, "temperature": 0.7}
+
+
+def _messages(question="How am I doing?"):
+    return [
+        LlmMessage(role=Role.SYSTEM, content="Be brief."),
+        LlmMessage(role=Role.USER, content=question),
+    ]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    current = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: current[0])
+    return current
+
+
+def test_equal_requests_share_a_key():
+    first = LlmCache.make_key("qwen3:4b", _messages(), dict(OPTIONS))
+    second = LlmCache.make_key("qwen3:4b", _messages(), dict(OPTIONS))
+
+    assert first == second
+
+
+@pytest.mark.parametrize(
+    "model, messages, options",
+    [
+        ("other-model", _messages(), OPTIONS),
+        ("qwen3:4b", _messages("Anything new?"), OPTIONS),
+        ("qwen3:4b", _messages(), {**OPTIONS, "num_predict": 500}),
+        ("qwen3:4b", _messages(), None),
+    ],
+)
+def test_different_requests_get_different_keys(model, messages, options):
+    base = LlmCache.make_key("qwen3:4b", _messages(), OPTIONS)
+
+    assert LlmCache.make_key(model, messages, options) != base
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = LlmCache(ttl_seconds=60)
+    response = LlmResponse(content="Keep it up!")
+    cache.set("key", response)
+
+    clock[0] += 59
+    assert cache.get("key") is response
+    clock[0] += 1
+    assert cache.get("key") is None
+
+
+def test_oldest_entry_is_evicted_at_max_size():
+    cache = LlmCache(max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.set(key, LlmResponse(content=key))
+
+    assert cache.get("a") is None
+    assert cache.get("b").content == "b"
+    assert cache.get("c").content == "c"
+
+
+def test_resetting_a_key_does_not_evict_others():
+    cache = LlmCache(max_entries=2)
+    cache.set("a", LlmResponse(content="a"))
+    cache.set("b", LlmResponse(content="b"))
+    cache.set("b", LlmResponse(content="b2"))
+
+    assert cache.get("a").content == "a"
+    assert cache.get("b").content == "b2"
+
+
+def test_generate_marks_cache_hits(make_llm):
+    llm = make_llm([{"response": "Keep it up!", "done": True}])
+
+    first = llm._generate(_messages())
+    second = llm._generate(_messages())
+
+    assert llm._session.posts == 1
+    assert "cached" not in first.metadata
+    assert second.content == first.content
+    assert second.metadata == {**first.metadata, "cached": True}
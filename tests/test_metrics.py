@@ -0,0 +1,27 @@
+"""Tests for the MetricBase recording defaults"""
+
+from datetime import datetime
+
+from app.metrics.implementations.alone import AloneTimeMetric
+from app.metrics.implementations.scale import ScaleMetric
+
+
+def test_record_replaces_same_day_entry(db, user_id):
+    metric = ScaleMetric(db=db)
+    metric.record(user_id, "80", datetime(2025, 1, 15, 8, 0))
+    entry = metric.record(user_id, "79.5", datetime(2025, 1, 15, 20, 0))
+
+    assert entry.value == 79.5
+    stored = metric.entry_repo.get_for_user(user_id, metric_name=metric.name)
+    assert [e.value_decimal for e in stored] == [79.5]
+
+
+def test_record_keeps_every_entry_when_not_replacing(db, user_id):
+    metric = AloneTimeMetric(db=db)
+    metric.record(user_id, "1", datetime(2025, 1, 15, 8, 0))
+    metric.record(user_id, "2.5", datetime(2025, 1, 15, 20, 0))
+
+    stored = metric.entry_repo.get_for_user(
+        user_id, metric_name=metric.name, order="asc"
+    )
+    assert [e.value_decimal for e in stored] == [1.0, 2.5]
@@ -0,0 +1,138 @@
+"""Tests for upgrading databases created by earlier schema versions"""
+
+from datetime import datetime, timedelta
+import sqlite3
+
+import pytest
+
+from app.data import Database, MetricEntryRepository
+
+# metric_entries as created before the word_count column existed
+LEGACY_SCHEMA = """
+CREATE TABLE users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL UNIQUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE metric_entries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    metric_name TEXT NOT NULL,
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    value_type TEXT NOT NULL,
+    value_boolean BOOLEAN,
+    value_integer INTEGER,
+    value_decimal REAL,
+    value_text TEXT,
+    metadata TEXT,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+"""
+
+NOTES = [
+    "Slept well and went for a long walk",
+    "   ",
+    "Busy day at work",
+    "",
+    "Felt  tired\tafter lunch\nbut recovered",
+]
+
+
+def _reference_text_summary(repo, user_id, days):
+    """Note statistics as NotesMetric computed them in Python"""
+    entries = repo.get_for_user(user_id=user_id, metric_name="notes", days=days)
+    with_content = [e for e in entries if e.value_text and e.value_text.strip()]
+    return {
+        "count": len(with_content),
+        "total_words": sum(len(e.value_text.split()) for e in with_content)
+        if with_content
+        else None,
+        "latest_text": with_content[0].value_text if with_content else None,
+    }
+
+
+@pytest.fixture
+def legacy_db_path(tmp_path):
+    path = tmp_path / "legacy.db"
+    now = datetime.now().replace(microsecond=0)
+    conn = sqlite3.connect(path)
+    conn.executescript(LEGACY_SCHEMA)
+    conn.execute("INSERT INTO users (name) VALUES ('legacy')")
+    for days_ago, text in enumerate(NOTES):
+        conn.execute(
+            "INSERT INTO metric_entries (user_id, metric_name, timestamp, "
+            "value_type, value_text) VALUES (1, 'notes', ?, 'text', ?)",
+            ((now - timedelta(days=days_ago)).isoformat(sep=" "), text),
+        )
+    conn.execute(
+        "INSERT INTO metric_entries (user_id, metric_name, timestamp, "
+        "value_type, value_decimal) VALUES (1, 'scale', ?, 'decimal', 80.0)",
+        (now.isoformat(sep=" "),),
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def migrated(legacy_db_path):
+    database = Database(legacy_db_path)
+    database.initialize()
+    yield database
+    database.close()
+
+
+def test_word_count_column_is_added_and_backfilled(migrated):
+    rows = migrated.execute(
+        "SELECT metric_name, value_text, word_count FROM metric_entries ORDER BY id"
+    )
+
+    notes = [row for row in rows if row["metric_name"] == "notes"]
+    assert [row["word_count"] for row in notes] == [len(text.split()) for text in NOTES]
+    scale = [row for row in rows if row["metric_name"] == "scale"]
+    assert scale[0]["word_count"] is None
+
+
+def test_text_summary_after_migration_matches_python(migrated):
+    repo = MetricEntryRepository(migrated)
+
+    summary = repo.get_text_summary(1, "notes", 7)
+
+    assert summary == _reference_text_summary(repo, 1, 7)
+    assert summary["count"] == 3
+    assert summary["latest_text"] == NOTES[0]
+
+
+def test_text_summary_excludes_blank_notes(migrated):
+    repo = MetricEntryRepository(migrated)
+
+    summary = repo.get_text_summary(1, "notes", 3)
+
+    # Only the first and third notes are in the window and non-blank
+    assert summary == _reference_text_summary(repo, 1, 3)
+    assert summary["count"] == 2
+    assert summary["total_words"] == 8 + 4
+
+
+def test_text_summary_of_only_blank_notes_is_empty(migrated):
+    migrated.execute("DELETE FROM metric_entries WHERE word_count > 0")
+    repo = MetricEntryRepository(migrated)
+
+    summary = repo.get_text_summary(1, "notes", 7)
+
+    assert summary == {"count": 0, "total_words": None, "latest_text": None}
+
+
+def test_initialize_is_idempotent_on_migrated_database(legacy_db_path):
+    for _ in range(2):
+        database = Database(legacy_db_path)
+        database.initialize()
+        database.close()
+
+    database = Database(legacy_db_path)
+    database.initialize()
+    rows = database.execute("PRAGMA table_info(metric_entries)")
+    assert [row["name"] for row in rows].count("word_count") == 1
+    database.close()
@@ -0,0 +1,42 @@
+"""Tests for OllamaLlm stream handling"""
+
+from app.llm.base import LlmMessage, Role
+
+MESSAGES = [LlmMessage(role=Role.USER, content="How am I doing?")]
+
+
+def test_completed_stream_is_joined(make_llm):
+    llm = make_llm([{"response": "Hel"}, {"response": "lo!", "done": True}])
+
+    response = llm._generate(MESSAGES)
+
+    assert response.content == "Hello!"
+    assert response.metadata == {"model": llm.model, "done": True}
+
+
+def test_error_chunk_returns_stream_error(make_llm):
+    llm = make_llm([{"response": "Hel"}, {"error": "model crashed"}])
+
+    response = llm._generate(MESSAGES)
+
+    assert response.content == "LLM stream failed: model crashed"
+    assert response.metadata["error"] == "stream_error"
+    assert response.metadata["detail"] == "model crashed"
+
+
+def test_stream_without_done_chunk_returns_stream_error(make_llm):
+    llm = make_llm([{"response": "Hel"}])
+
+    response = llm._generate(MESSAGES)
+
+    assert response.content.startswith("LLM stream failed: ")
+    assert response.metadata["error"] == "stream_error"
+
+
+def test_failed_streams_are_not_cached(make_llm):
+    llm = make_llm([{"response": "Hel"}])
+
+    llm._generate(MESSAGES)
+    llm._generate(MESSAGES)
+
+    assert llm._session.posts == 2